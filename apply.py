@@ -3,6 +3,7 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
 import os
@@ -10,13 +11,23 @@ import logging
 import time
 import traceback
 import json
+import re
+import argparse
+from urllib.parse import urlencode
 from datetime import datetime
 
 # Custom imports
 from utils.selenium_helper import Helper
-from utils.query_keywords import bad_keywords, good_keywords, query_search
+from utils.query_keywords import query_searches, search_filters
 from utils.timer import timer
-from utils.logging_formatter import ColoredFormatter
+from utils.log_pipeline import configure_logging, stop_logging
+from utils.page_prefetcher import PagePrefetcher
+from utils.submission_watcher import SubmissionWatcher, enable_network_log
+from utils.selector_registry import SelectorRegistry
+from utils.job_queue import JobQueue
+from utils.posting_index import PostingIndex
+from utils.job_filter import passes_keyword_filters, keyword_filter_reason, score_job
+from utils.job_tracking import update_job_tracking
 
 # State variables to fully define session state. Some variables can be changed by user like jobs_per_page.
 DEFAULT_STATE = {
@@ -26,9 +37,16 @@ DEFAULT_STATE = {
     'visited_indices': [0, 0],  # [start_idx, current_idx]
     'last_applied_job_idx': 0,  # idx of last successful application
     'did_log_submissions': False,
+    'mode': 'inline', # which mode of main() the session ran in, recorded in job_tracking.json
     'session_start_time': None,
     'num_jobs_to_skip_initially': 0,
     'jobs_per_page': 25,
+    'duplicates_skipped': 0,
+    'candidates_count': 0, # jobs that passed every filter and that we tried to apply to
+    'failures_count': 0, # of those, the ones we didn't manage to apply to
+    'network_confirmed_count': 0, # submissions confirmed from the network response rather than the toast
+    'window_size': 0, # handle job cards in windows of this many (0 = the whole page at once)
+    'prune_dom': False, # with window_size, hide finished windows of cards on the page
 }
 DEBUG_STATE = {
     'pause-after-submit': 0, # seconds
@@ -41,6 +59,8 @@ SELECTORS = {
     'job_block': "[data-hook*='job-result-card']", # a single job application block in the left column
     'job_block_title': "[id]",
     'job_block_company': "span", # first span in the block
+    'job_block_link': "a[href*='/jobs/']", # link to the posting's own page
+    'job_block_location': "[data-hook*='location']", # only read when DEDUPE_BY_LOCATION is on
     'apply_btn': "[aria-label='Apply']",
     'apply_btns_internal_or_external': ["[aria-label='Apply']", "[aria-label='Apply externally']"],
     'submit_btn': "//button[contains(text(), 'Submit Application')]",
@@ -53,6 +73,21 @@ SELECTORS = {
     'successful_apply_popup': "//div[@role='alert']//div[contains(text(), 'Application submitted!')]",
 }
 
+# Fallbacks for the selectors that hurt most when they break. Each target's candidates are tried in whatever order has worked best so far (see SelectorRegistry).
+SELECTOR_FALLBACKS = {
+    'job_block': ["[data-hook='jobs-card']"], # older Handshake markup
+    'apply_modal_content': ["[role='dialog'][aria-modal='true']"],
+    'submit_btn': ["//button[@type='submit'][contains(., 'Submit')]"],
+    'pagination_next_btn': ["button[aria-label='next page' i]", "button[aria-label*='next' i]"],
+    'successful_apply_popup': ["//*[@role='alert' or @role='status']//*[contains(text(), 'Application submitted')]"],
+}
+SELECTOR_CANDIDATES = {name: [SELECTORS[name], *fallbacks] for name, fallbacks in SELECTOR_FALLBACKS.items()}
+
+SEARCH_URL = "https://jhu.joinhandshake.com/job-search"
+
+# Include a job's location in its duplicate fingerprint. Turn on if you want the same role in different cities to count as different jobs.
+DEDUPE_BY_LOCATION = False
+
 @timer
 def open_and_login(url, driver, s, email, password):
     """
@@ -76,6 +111,30 @@ def open_and_login(url, driver, s, email, password):
     if driver.current_url != url:
         driver.get(url)
 
+def build_search_url(query, filters, page=1, per_page=25):
+    """
+    Builds a Handshake job search URL. `filters` is a list of (param, value) pairs, see `search_filters` in query_keywords.py.
+    """
+    params = list(filters) + [("query", query), ("per_page", per_page), ("page", page)]
+    return f"{SEARCH_URL}?{urlencode(params)}"
+
+def build_searches():
+    """
+    Every (query, filter set) combination to scan, each with a `key` that identifies it in the queue's source & progress tables.
+    """
+    return [
+        {'key': f'{query} | {filters_name}', 'query': query, 'filters': filters}
+        for query in query_searches
+        for filters_name, filters in search_filters.items()
+    ]
+
+def click_next_page(s, timeout=3):
+    """
+    Clicks the pagination's next button. Raises SelectorNotFound (with a report of every candidate selector tried) if there isn't one.
+    """
+    next_btn = s.selectors.find('pagination_next_btn', timeout=timeout, clickable=True, required=True)
+    s.driver.execute_script("arguments[0].click();", next_btn)
+
 def click_out_of_modal(s):
     """
     Clicks out of a modal if there is one. Throws nothing if no modal exists.
@@ -83,187 +142,195 @@ def click_out_of_modal(s):
     if s.element_exists(SELECTORS['apply_modal_content']):
         s.click_with_mouse(SELECTORS['dismiss_btn'])
 
-@timer
-def update_job_tracking(state):
+def apply_to_open_job(state, s, apply_btn, title_text, company_name):
     """
-    Updates job tracking file with current state.
+    Applies to the job that's currently open in the right panel (or on its own page): click apply, fill every selection in the modal with our documents, and submit.
+
+    Returns True if Handshake confirmed the application, False otherwise (and counts it in state['failures_count']).
     """
-    if state['did_log_submissions']:
-        return
-    
-    # Calculate session duration in minutes
-    session_duration = round((datetime.now() - state['session_start_time']).total_seconds() / 60, 2)
-    
-    tracking_file = "utils/job_tracking.json"
-    
-    # Initialize empty data file if it doesn't exist, and initialize `data` either way
+    state['candidates_count'] += 1
+    logging.info(f'📝 Trying to apply to job w/ title: {title_text} @ {company_name}')
     try:
-        # Read existing data
-        with open(tracking_file, 'r') as f:
-            data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        # Initialize if file doesn't exist or is invalid
-        data = {"total_submissions": 0, "last_applied_job_idx": 0, "sessions": []}
-    
-    # Update cumulative stats
-    data["total_submissions"] += state['submissions_count']
-    data["last_applied_job_idx"] = max(data["last_applied_job_idx"], state['last_applied_job_idx'])
-    
-    # Add new session to `data.sessions`
-    current_time = datetime.now().strftime("%m/%d/%y %I:%M%p").lower()
-    logging.debug(f'Logging job list len: {state["job_list_len"]}, tab count: {state["tab_count"]}, visited range: {state["visited_indices"]}')
-    new_session = {
-        "date": current_time,
-        "session_submissions": state['submissions_count'],
-        "job_list_len": state['job_list_len'],
-        "visited_indices": state['visited_indices'],
-        "last_applied_job_idx": state['last_applied_job_idx'],
-        "session_duration_minutes": session_duration
-    }
-    data["sessions"].append(new_session)
-        
-    # Write updated data to data file
-    with open(tracking_file, 'w') as f:
-        json.dump(data, f, indent=4)
+        s.click_web_element(apply_btn)
+        apply_modal = s.selectors.find('apply_modal_content', timeout=1, clickable=True)
+        selection_elements = s.find_all_elements(SELECTORS['selection_elements'], parent=apply_modal)
+        for selection_input in selection_elements:
+            # Click selection autofill if it's already available
+            selection_fill_grandparent = selection_input.find_element(By.XPATH, "../..")
+            selection_fill = s.find_element(SELECTORS['selection_elements_to_fill'], by=By.XPATH, parent=selection_fill_grandparent)
+            if selection_fill:
+                s.click_with_wait(SELECTORS['selection_elements_to_fill'], by=By.XPATH, parent=selection_fill_grandparent)
+                continue
+
+            # Otherwise, click the search box first to get the autofill option
+            selection_input.click()
+            time.sleep(int(DEBUG_STATE['pause-between-selection-fills']))
+            selection_fill = s.find_element_with_wait(SELECTORS['selection_elements_to_fill'], by=By.XPATH, timeout=3)
+            if not selection_fill:
+                raise Exception('🔄 No selection fill found')
+            s.click_web_element(selection_fill)
+    except Exception as e:
+        logging.error(f"✌️ Ts too complicated. Error clicking selections, will skip to next job. Error: {str(e)}")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f"Apply modal snapshot: {s.snapshot_dom(s.selectors.best('apply_modal_content') + ' [role]')}")
+        # logging.error(f'Trace: {traceback.format_exc()}')
+        state['failures_count'] += 1
+        return False
+
+    # Click submit on this job app
+    try:
+        # Only wait for the button if it might still be rendering
+        if not selection_elements:
+            submit_btn = s.selectors.find('submit_btn', timeout=3, clickable=True, required=True)
+        else:
+            submit_btn = s.selectors.find('submit_btn', timeout=0, required=True)
+        # check if submit_btn is disabled, and if it is, remove disabled attribute
+        if submit_btn.get_attribute('disabled'):
+            s.driver.execute_script("arguments[0].removeAttribute('disabled');", submit_btn)
+        watcher = SubmissionWatcher(s.driver)
+        s.actions.move_to_element(submit_btn).click().perform()
+
+        # Make sure we've applied to the job: trust the submit request's response, and only fall back on the toast if we didn't see one
+        response = watcher.wait_for_response(timeout=2)
+        if response:
+            succeeded, status = response
+            logging.info(f'📡 Submit request answered with status {status}')
+            if not succeeded:
+                raise Exception(f'😢 We hit submit but Handshake answered with status {status}')
+            state['network_confirmed_count'] += 1
+        else:
+            successful_apply_popup = s.selectors.find('successful_apply_popup', timeout=2, clickable=True)
+            if not successful_apply_popup:
+                raise Exception('😢 We hit submit but did not apply')
 
-    # Mark that we've logged submissions
-    state['did_log_submissions'] = True
+        state['submissions_count'] += 1
+        logging.info(f'🚀 Applied to job: {title_text} @ {company_name} ({state["submissions_count"]} so far)')
+    except Exception as e:
+        logging.error(f"Error clicking submit: {str(e)}")
+        # Sometimes Handshake's button stop working (with or without a bot) — that's their problem
+        if s.element_exists(SELECTORS['submit_btn_disabled'], by=By.XPATH, parent=apply_modal):
+            logging.error('😡 Wasn\'t able to remove disabled from Handshake submit button')
+        else:
+            # Otherwise it's prob our bad
+            logging.error('🔄 No submit button found or wasn\'t able to click it')
+        state['failures_count'] += 1
+        return False
+    time.sleep(int(DEBUG_STATE['pause-after-submit']))
+    return True
 
 @timer
-def apply_to_jobs_in_left_panel(state, s):
+def apply_to_jobs_in_left_panel(state, s, index, rejected, on_page_start=None):
     """
     Apply to all jobs in this page (and no other pages). Read jobs from open left panel, skip jobs (& toggle necessary pages), and apply to the rest that fit our criteria: internal applications (i.e. no link to apply on their site) w/ one good keyword and none of the bad keywords.
 
     Before applying to every job, it will try to refresh the list of jobs if it's gotten stale and some job no longer exists.
+
+    Jobs whose fingerprint (title, company and optionally location) is already in `index` (applied to in any session) or `rejected` (filtered out or external earlier this run) are skipped before their card is clicked.
+    Only jobs we applied to go in `index`, which is persisted; rejects only go in the in-memory `rejected`, so they're checked again against the current keywords next run.
+
+    `on_page_start` is called once we're on the page we'll apply on (after skipping), e.g. to start prefetching the next page.
+
+    With state['window_size'] set, cards are handled in windows of that many: we only hold handles for the current window, and with state['prune_dom'] the cards of a finished window are hidden (display: none, so the browser stops laying them out) when we move on to the next one, so big pages (large jobs_per_page) cost the same per job as small ones. Cards are hidden rather than removed, since Handshake's front end still owns them and re-renders the list when we change pages.
     """
 
-    # Apply to all jobs in left panel
-    job_list = s.find_all_elements_with_wait(SELECTORS['job_block'])
-    assert job_list, '🔄 No jobs found'
-    state['job_list_len'] = len(job_list)
+    # Apply to all jobs in left panel. In windowed mode, only count the cards instead of getting a handle for every one
+    if state['window_size']:
+        job_list = None
+        job_list_len = count_cards(s)
+    else:
+        job_list = s.selectors.find_all('job_block')
+        job_list_len = len(job_list)
+    assert job_list_len, '🔄 No jobs found'
+    state['job_list_len'] = job_list_len
 
     # Skip first few jobs
-    pages_to_skip = state['num_jobs_to_skip_initially'] // len(job_list)
-    remaining_jobs = state['num_jobs_to_skip_initially'] % len(job_list)
+    pages_to_skip = state['num_jobs_to_skip_initially'] // job_list_len
+    remaining_jobs = state['num_jobs_to_skip_initially'] % job_list_len
 
     # Skip full pages and update visited_indices state
     for i in range(pages_to_skip):
-        s.click_with_wait(SELECTORS['pagination_next_btn'], timeout=4)
-        state['num_jobs_to_skip_initially'] -= len(job_list)
-        state['visited_indices'][0] += len(job_list)
-        state['visited_indices'][1] += len(job_list)
-        time.sleep(int(len(job_list)) / 100)
+        click_next_page(s, timeout=4)
+        state['num_jobs_to_skip_initially'] -= job_list_len
+        state['visited_indices'][0] += job_list_len
+        state['visited_indices'][1] += job_list_len
+        time.sleep(int(job_list_len) / 100)
     state['tab_count'] += pages_to_skip
     state['visited_indices'][0] += remaining_jobs
     state['visited_indices'][1] += remaining_jobs
+    if on_page_start:
+        on_page_start()
+
+    # Only hold handles for one window of cards at a time (the whole page unless state['window_size'] is set)
+    window_size = state['window_size'] or job_list_len
+    window_start = remaining_jobs
+    window = job_list[window_start:] if job_list else load_card_window(s, window_start, window_size)
+    del job_list
 
     # Apply to rest
-    for i in range(remaining_jobs, len(job_list)):
+    for i in range(remaining_jobs, job_list_len):
         state['visited_indices'][1] += 1
         click_out_of_modal(s)
 
-        # Revive job_list if stale
-        if not job_list[i] or not s.web_element_exists(job_list[i]):
-            old_len = len(job_list)
-            job_list = s.find_all_elements_with_wait(SELECTORS['job_block'])
-            assert job_list and len(job_list) == old_len, '🔄 Failed to revive job_list'
-            logging.info(f'💪 Revived job_list to length {len(job_list)}')
-        
-        # Scroll and click on job in left panel
-        try:
-            s.scroll_into_view(job_list[i])
-            s.click_web_element(job_list[i])
-        except:
-            logging.error('🔄 Failed to scroll and click on job in left panel')
-            continue
+        # Move on to the next window, dropping the last one's handles (and with prune_dom, hiding its cards)
+        if i >= window_start + window_size:
+            if state['prune_dom']:
+                prune_cards(s, window)
+            window_start = i
+            window = load_card_window(s, window_start, window_size)
+        card = window[i - window_start] if i - window_start < len(window) else None
+
+        # Revive window if stale
+        if not card or not s.web_element_exists(card):
+            count_cards(s)
+            window = load_card_window(s, window_start, window_size)
+            assert len(window) == min(window_size, job_list_len - window_start), '🔄 Failed to revive job_list'
+            card = window[i - window_start]
+            logging.info(f'💪 Revived window of {len(window)} jobs starting at {window_start}')
         
-        # Skip external applications
-        apply_btn, idx = s.find_any_element_with_wait(*SELECTORS['apply_btns_internal_or_external'])
-        if idx == 1 or idx == -1:
-            continue
-            
-        # Filter jobs with good and bad keywords
+        # Read title & company from the card, so duplicates and keyword misses never cost a click
         try:
-            title_element = s.find_element(SELECTORS['job_block_title'], parent=job_list[i])
+            title_element = s.find_element(SELECTORS['job_block_title'], parent=card)
             if not title_element:
                 logging.error(f'🔄 No title element found for job {i}')
                 continue
             title_text = title_element.text
-            company_name = s.find_element(SELECTORS['job_block_company'], parent=job_list[i]).text
-
-            # Check that all levels of good_keywords are satisfied
-            break_flag = False
-            for level_name, good_keyword_level in good_keywords.items():
-                if not any(keyword.lower() in title_text.lower() for keyword in good_keyword_level):
-                    logging.info(f"✋ Skipping job with title: {title_text} - doesn't match requirement for {level_name}")
-                    break_flag = True
-                    break
-            if break_flag: continue
-
-            # Check that no bad keywords are in the title
-            if any(keyword.lower() in title_text.lower() for keyword in bad_keywords):
-                continue
+            company_name = s.find_element(SELECTORS['job_block_company'], parent=card).text
+            location = read_card_location(s, card)
         except Exception as e:
             logging.error(f"Failed to check job title: {str(e)}")
             continue
 
-        # Apply to the specific job in right panel: for every job, click it, and simply click 35px below all the input selections.
-        print()
-        logging.info(f'📝 Trying to apply to job w/ title: {title_text} @ {company_name}')
-        try:
-            s.click_web_element(apply_btn)
-            apply_modal = s.find_element_with_wait(SELECTORS['apply_modal_content'], timeout=1) # Seems to use full time no matter what, strange.
-            selection_elements = s.find_all_elements(SELECTORS['selection_elements'], parent=apply_modal)
-            for selection_input in selection_elements:
-                # Click selection autofill if it's already available
-                selection_fill_grandparent = selection_input.find_element(By.XPATH, "../..")
-                selection_fill = s.find_element(SELECTORS['selection_elements_to_fill'], by=By.XPATH, parent=selection_fill_grandparent)
-                if selection_fill:
-                    s.click_with_wait(SELECTORS['selection_elements_to_fill'], by=By.XPATH, parent=selection_fill_grandparent)
-                    continue
-
-                # Otherwise, click the search box first to get the autofill option
-                selection_input.click()
-                time.sleep(int(DEBUG_STATE['pause-between-selection-fills']))
-                selection_fill = s.find_element_with_wait(SELECTORS['selection_elements_to_fill'], by=By.XPATH, timeout=3)
-                if not selection_fill:
-                    raise Exception('🔄 No selection fill found')
-                s.click_web_element(selection_fill)
-        except Exception as e:
-            logging.error(f"✌️ Ts too complicated. Error clicking selections, will skip to next job. Error: {str(e)}")
-            # logging.error(f'Trace: {traceback.format_exc()}')
+        # Skip copies of jobs we've already dealt with (reposts, or shifted onto another page)
+        if index.contains(title_text, company_name, location) or rejected.contains(title_text, company_name, location):
+            state['duplicates_skipped'] += 1
+            logging.info(f'👯 Skipping duplicate job: {title_text} @ {company_name}')
             continue
 
-        # Click submit on this job app
+        # Filter jobs with good and bad keywords
+        if not passes_keyword_filters(title_text):
+            rejected.add(title_text, company_name, location)
+            continue
+
+        # Scroll and click on job in left panel
         try:
-            submit_btn = None
-            if not selection_elements:
-                submit_btn = s.find_element_with_wait(SELECTORS['submit_btn'], by=By.XPATH, timeout=3)
-            else:
-                submit_btn = s.find_element(SELECTORS['submit_btn'], by=By.XPATH)
-            # check if submit_btn is disabled, and if it is, remove disabled attribute
-            if submit_btn.get_attribute('disabled'):
-                s.driver.execute_script("arguments[0].removeAttribute('disabled');", submit_btn)
-            s.actions.move_to_element(submit_btn).click().perform()
-
-            # Make sure we've applied to the job
-            successful_apply_popup = s.find_element_with_wait(SELECTORS['successful_apply_popup'], by=By.XPATH, timeout=2)
-            if not successful_apply_popup:
-                raise Exception('😢 We hit submit but did not apply')
+            s.scroll_into_view(card)
+            s.click_web_element(card)
+        except:
+            logging.error('🔄 Failed to scroll and click on job in left panel')
+            continue
+        
+        # Skip external applications
+        apply_btn, idx = s.find_any_element_with_wait(*SELECTORS['apply_btns_internal_or_external'])
+        if idx == 1:
+            rejected.add(title_text, company_name, location)
+        if idx == 1 or idx == -1:
+            continue
 
-            state['submissions_count'] += 1
-            state['last_applied_job_idx'] = state['visited_indices'][1]
-            logging.info(f'🚀 Applied to job: {title_text} @ {company_name} ({state["submissions_count"]} so far)')
-        except Exception as e:
-            logging.error(f"Error clicking submit: {str(e)}")
-            # Sometimes Handshake's button stop working (with or without a bot) — that's their problem
-            if s.element_exists(SELECTORS['submit_btn_disabled'], by=By.XPATH, parent=apply_modal):
-                logging.error('😡 Wasn\'t able to remove disabled from Handshake submit button')
-            else:
-                # Otherwise it's prob our bad
-                logging.error('🔄 No submit button found or wasn\'t able to click it')
+        # Apply to the specific job in right panel
+        if not apply_to_open_job(state, s, apply_btn, title_text, company_name):
             continue
-        time.sleep(int(DEBUG_STATE['pause-after-submit']))
+        index.add(title_text, company_name, location)
+        state['last_applied_job_idx'] = state['visited_indices'][1]
 
     # Only update state if we went through loop without error
     state['num_jobs_to_skip_initially'] = 0
@@ -272,16 +339,352 @@ def apply_to_jobs_in_left_panel(state, s):
     click_out_of_modal(s)
     logging.info("✅ Successfully applied to all jobs in current tab")
 
+def count_cards(s, timeout=3):
+    """
+    Number of job cards on the page, waiting up to `timeout` seconds for them to render.
+
+    The lookup goes through the selector registry first, so a fallback gets tried (and learned) if the main job_block selector broke, and the count and the windows (see load_card_window) then use whichever selector matched.
+    """
+    if not s.selectors.find('job_block', timeout=timeout):
+        return 0
+    return s.driver.execute_script("return document.querySelectorAll(arguments[0]).length;", s.selectors.best('job_block'))
+
+def load_card_window(s, start, size):
+    """
+    Handles for the job cards at DOM indices [start, start + size), fetched in one script call without holding handles for the rest of the page.
+    """
+    return s.driver.execute_script(
+        "return Array.from(document.querySelectorAll(arguments[0])).slice(arguments[1], arguments[1] + arguments[2]);",
+        s.selectors.best('job_block'), start, size,
+    )
+
+def prune_cards(s, cards):
+    """
+    Hides finished job cards, to keep Chrome's layout costs flat on big pages. They stay in the DOM (so card indices don't shift and Handshake's own re-render still finds its nodes).
+    """
+    try:
+        s.driver.execute_script("arguments[0].forEach(card => card.style.display = 'none');", cards)
+    except Exception as e:
+        logging.debug(f'Could not hide job cards: {str(e)}')
+
+def read_card_location(s, card):
+    """
+    Location text of a job card, or None if we don't dedupe by location (so we don't pay for the lookup).
+    """
+    if not DEDUPE_BY_LOCATION:
+        return None
+    location_element = s.find_element(SELECTORS['job_block_location'], parent=card)
+    return location_element.text if location_element else ''
+
+# Reads every job card on the page in one browser round trip: arguments are the card, title, company, link & location selectors.
+READ_JOB_CARDS_SCRIPT = """
+    const [cardSelector, titleSelector, companySelector, linkSelector, locationSelector] = arguments;
+    return Array.from(document.querySelectorAll(cardSelector)).map(card => {
+        const title = card.querySelector(titleSelector);
+        const company = card.querySelector(companySelector);
+        const link = card.querySelector(linkSelector);
+        const location = locationSelector ? card.querySelector(locationSelector) : null;
+        return {
+            card: card,
+            title: title ? title.innerText : null,
+            company: company ? company.innerText : "",
+            url: link ? link.href : null,
+            text: card.innerText,
+            location: locationSelector ? (location ? location.innerText : "") : null,
+        };
+    });
+"""
+
+def read_job_cards(s):
+    """
+    Reads what we need to queue or classify every job in the left panel, without clicking anything.
+
+    Returns one dict per card with card (the WebElement), job_id, url, title, company, location and text (everything the card says, e.g. when it was posted). job_id/url are None if the card doesn't link to its posting, title is None if it has no title.
+    """
+    cards = s.driver.execute_script(
+        READ_JOB_CARDS_SCRIPT,
+        s.selectors.best('job_block'),
+        SELECTORS['job_block_title'],
+        SELECTORS['job_block_company'],
+        SELECTORS['job_block_link'],
+        SELECTORS['job_block_location'] if DEDUPE_BY_LOCATION else None,
+    )
+    for job in cards:
+        match = re.search(r'/jobs/(\d+)', job['url'] or '')
+        job['job_id'] = match.group(1) if match else None
+    return cards
+
+@timer
+def scan_jobs_in_left_panel(state, s, queue, index, rejected, source=None):
+    """
+    Producer stage: read every job card in this page and push the ones that pass our keyword filters into the queue. Never clicks a card or opens a modal, so it runs at page-load speed.
+
+    Whether a job is internal or external is only visible on its posting, so that check is left to the applier.
+
+    Queued jobs go in the persisted `index`, keyword rejects only in the in-memory `rejected`, so they're checked again against the current keywords next run.
+
+    Returns the number of cards on the page (0 once we've run past the last page).
+    """
+    if not s.selectors.find_all('job_block'):
+        return 0
+    job_list = read_job_cards(s)
+    state['job_list_len'] = len(job_list)
+
+    queued_count = 0
+    for job in job_list:
+        state['visited_indices'][1] += 1
+        if not job['job_id'] or not job['title']:
+            continue
+
+        # Same posting found again by another search (or another page of this one)
+        status = queue.status(job['job_id'])
+        if status not in (None, 'evicted'):
+            if source is not None:
+                queue.add_source(job['job_id'], source)
+            state['duplicates_skipped'] += 1
+            continue
+        # Evicted postings are in the index (they were queued once) but only lost their place to better ones, so they get another chance
+        if (status is None and index.contains(job['title'], job['company'], job['location'])) or rejected.contains(job['title'], job['company'], job['location']):
+            state['duplicates_skipped'] += 1
+            continue
+        if not passes_keyword_filters(job['title']):
+            rejected.add(job['title'], job['company'], job['location'])
+            continue
+        priority = score_job(job['title'], job['company'], job['text'])
+        if queue.push(job['job_id'], job['url'], job['title'], job['company'], source=source, priority=priority):
+            index.add(job['title'], job['company'], job['location'])
+            queued_count += 1
+
+    logging.info(f'📥 Queued {queued_count} new jobs from current tab (queue: {queue.depth()})')
+    return len(job_list)
+
 @timer
-def main(state=DEFAULT_STATE, driver=None, email=None, password=None, debug_level=logging.INFO):
+def scan_searches(state, s, queue, index, rejected, searches, max_pages=None, empty_page_retries=2):
+    """
+    Producer stage over several searches: always scan the next page of the unfinished search that's furthest behind, so all of them feed the queue together instead of one search hogging the scanner.
+
+    Progress (last page scanned, whether a search ran out of pages) is kept per search in the queue, so a restarted scan resumes every search where it left off.
+    A search only runs out of pages on a page with fewer than jobs_per_page cards. A page with no cards at all may just not have loaded, so it isn't recorded and gets retried (up to `empty_page_retries` times, after which the search is left for the next run).
+    Stops after `max_pages` pages if given. Returns True if some search still has pages left.
+    """
+    per_page = state['jobs_per_page']
+    active = [search for search in searches if not queue.get_progress(search['key'])[1]]
+    empty_pages = {} # search key -> empty pages in a row
+    pages_scanned = 0
+    while active and (max_pages is None or pages_scanned < max_pages):
+        search = min(active, key=lambda search: queue.get_progress(search['key'])[0])
+        page = queue.get_progress(search['key'])[0] + 1
+        s.driver.get(build_search_url(search['query'], search['filters'], page, per_page))
+        time.sleep(per_page / 100) # 10 seconds per 1000 jobs
+        state['tab_count'] += 1
+        pages_scanned += 1
+
+        logging.info(f'🔎 Scanning page {page} of "{search["key"]}"')
+        jobs_on_page = scan_jobs_in_left_panel(state, s, queue, index, rejected, source=search['key'])
+        if jobs_on_page == 0:
+            empty_pages[search['key']] = empty_pages.get(search['key'], 0) + 1
+            if empty_pages[search['key']] > empty_page_retries:
+                logging.warning(f'🔄 Page {page} of "{search["key"]}" came up empty {empty_pages[search["key"]]} times, leaving it for the next scan')
+                active.remove(search)
+            continue
+        empty_pages[search['key']] = 0
+        exhausted = jobs_on_page < per_page
+        queue.set_progress(search['key'], page, exhausted)
+        if exhausted:
+            logging.info(f'✅ Finished scanning "{search["key"]}" after {page} pages')
+            active.remove(search)
+    return bool(active)
+
+@timer
+def schedule_jobs(state, s, queue, index, rejected, searches, lookahead_pages=5, capacity=200):
+    """
+    Scheduling mode: scan `lookahead_pages` pages ahead (across all searches), keep the best `capacity` candidates in the queue by score (see score_job), apply to them highest-score first, and repeat until every search is scanned and the queue is empty.
+
+    The queue (with its priorities) lives in SQLite, so a restarted session picks up the same ordering.
+    """
+    pages_left = True
+    while True:
+        if pages_left:
+            pages_left = scan_searches(state, s, queue, index, rejected, searches, max_pages=lookahead_pages)
+            evicted = queue.trim(capacity)
+            if evicted:
+                logging.info(f'🗑️ Evicted {evicted} lowest-scoring jobs to keep the queue at {capacity}')
+        if not queue.depth().get('pending'):
+            if not pages_left:
+                logging.info(f'✅ Scanned every search and emptied the queue (queue: {queue.depth()})')
+                return
+            continue
+        apply_to_queued_jobs(state, s, queue, idle_timeout=0)
+
+def classify_job_card(s, job, index, seen, check_external=True):
+    """
+    Decides what the bot would do with a job card, without opening an apply modal. Returns (decision, reason), where decision is one of:
+    'unreadable', 'duplicate', 'filtered_level', 'filtered_bad_keyword', 'external', 'no_apply_button' or 'candidate'.
+
+    The keyword filters run first, so the report always shows what the current keywords do with a job, even one handled in an earlier session.
+    `index` is the persisted PostingIndex of jobs applied to or queued before, `seen` an in-memory one of cards already classified this run.
+    Only cards that pass the keyword filters get clicked (to see their apply button), and only if `check_external`.
+    """
+    if not job['title']:
+        return 'unreadable', 'no title'
+
+    reason = keyword_filter_reason(job['title'])
+    if reason and reason[0] == 'level':
+        return 'filtered_level', reason[1]
+    if reason:
+        return 'filtered_bad_keyword', reason[1]
+
+    if index.contains(job['title'], job['company'], job['location']):
+        return 'duplicate', 'applied to or queued in a previous session'
+    if not seen.add(job['title'], job['company'], job['location']):
+        return 'duplicate', 'seen earlier in this run'
+
+    if check_external:
+        s.scroll_into_view(job['card'])
+        s.click_web_element(job['card'])
+        _, idx = s.find_any_element_with_wait(*SELECTORS['apply_btns_internal_or_external'])
+        if idx == 1:
+            return 'external', None
+        if idx == -1:
+            return 'no_apply_button', None
+    return 'candidate', None
+
+@timer
+def dry_run_searches(state, s, index, searches, report_path="utils/dry_run_report.json", check_external=True):
+    """
+    Walks every result page of every search and records what the bot would do with each job (see classify_job_card), without applying to anything.
+    Writes a report with per-decision counts and every decision to `report_path`.
+    """
+    per_page = state['jobs_per_page']
+    seen = PostingIndex(path=None, use_location=index.use_location)
+    decisions = []
+    for search in searches:
+        page = 0
+        while True:
+            page += 1
+            s.driver.get(build_search_url(search['query'], search['filters'], page, per_page))
+            time.sleep(per_page / 100) # 10 seconds per 1000 jobs
+            state['tab_count'] += 1
+            if not s.selectors.find_all('job_block'):
+                break
+            job_list = read_job_cards(s)
+            state['job_list_len'] = len(job_list)
+
+            for job in job_list:
+                state['visited_indices'][1] += 1
+                try:
+                    decision, reason = classify_job_card(s, job, index, seen, check_external)
+                except Exception as e:
+                    decision, reason = 'unreadable', str(e)
+                decisions.append({
+                    'search': search['key'],
+                    'page': page,
+                    'title': job['title'],
+                    'company': job['company'],
+                    'url': job['url'],
+                    'decision': decision,
+                    'reason': reason,
+                })
+            logging.info(f'🔎 Classified page {page} of "{search["key"]}" ({len(decisions)} jobs so far)')
+            if len(job_list) < per_page:
+                break
+
+    counts = {}
+    for entry in decisions:
+        counts[entry['decision']] = counts.get(entry['decision'], 0) + 1
+    report = {
+        'date': datetime.now().strftime("%m/%d/%y %I:%M%p").lower(),
+        'searches': [search['key'] for search in searches],
+        'counts': counts,
+        'decisions': decisions,
+    }
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=4)
+    logging.info(f'📋 Dry run classified {len(decisions)} jobs: {counts}. Report written to {report_path}')
+
+@timer
+def apply_to_queued_jobs(state, s, queue, idle_timeout=60, poll_interval=5, max_failures_in_row=5):
+    """
+    Consumer stage: pull jobs off the queue, open each posting directly and apply. Runs until the queue has been empty for `idle_timeout` seconds, so a worker can be started before (or alongside) the scanner.
+
+    Stops (raises) instead of burning through the queue when the worker itself is the problem: if the browser session dies, the job is given back without counting the attempt, and after `max_failures_in_row` failed jobs in a row (e.g. Handshake says "Job Not Found" for everything) we stop and leave the rest pending.
+    """
+    idle_since = None
+    failures_in_row = 0
+    while True:
+        job = queue.claim()
+        if job is None:
+            idle_since = idle_since or time.time()
+            if time.time() - idle_since >= idle_timeout:
+                logging.info(f'✅ Queue has been empty for {idle_timeout}s, worker is done (queue: {queue.depth()})')
+                return
+            time.sleep(poll_interval)
+            continue
+        idle_since = None
+        state['visited_indices'][1] += 1
+
+        try:
+            s.driver.get(job['url'])
+
+            # Skip external applications
+            apply_btn, idx = s.find_any_element_with_wait(*SELECTORS['apply_btns_internal_or_external'])
+            if idx == 1:
+                queue.ack(job['job_id'], status='skipped')
+                continue
+            if idx == -1:
+                raise Exception('🔄 No apply button found')
+
+            if not apply_to_open_job(state, s, apply_btn, job['title'], job['company']):
+                raise Exception('😢 Did not apply')
+            queue.ack(job['job_id'])
+            failures_in_row = 0
+        except Exception as e:
+            if isinstance(e, WebDriverException) and not session_alive(s.driver):
+                queue.release(job['job_id'])
+                logging.critical(f"🪦 Browser session died while applying to queued job {job['job_id']}, giving it back to the queue")
+                raise
+            logging.error(f"Failed to apply to queued job {job['job_id']} (attempt {job['attempts']}): {str(e)}")
+            queue.nack(job['job_id'], str(e))
+            failures_in_row += 1
+            if failures_in_row >= max_failures_in_row:
+                raise Exception(f'🔄 {failures_in_row} queued jobs in a row failed, stopping so the rest of the queue isn\'t used up (queue: {queue.depth()})')
+        finally:
+            if session_alive(s.driver):
+                click_out_of_modal(s)
+
+def session_alive(driver):
+    """
+    Whether the browser session still answers, to tell a dead browser apart from a page that misbehaved.
+    """
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+@timer
+def main(state=DEFAULT_STATE, driver=None, email=None, password=None, debug_level=logging.INFO, mode='inline', queue_path="utils/job_queue.db", rescan=False, log_json_path=None, check_external=True, lookahead_pages=5, pipeline=False):
     """
     A lot of setup: Load env variables (email, password), set up driver (for )
+
+    mode:
+        'inline': scan and apply page by page in one loop (the original behavior)
+        'scan': only walk result pages of every search in query_keywords.py and push candidates into the queue at `queue_path`. Resumes each search where the last scan stopped, unless `rescan` is set.
+        'apply': only pull jobs from the queue and apply, highest score first. Run as many of these as you want next to one scanner.
+        'schedule': scan `lookahead_pages` pages ahead, apply to the best-scoring jobs found first, and repeat (see schedule_jobs).
+        'dry_run': walk every page of every search and write a report of what the bot would do with each job, without applying. `check_external` controls whether cards that pass the keyword filters get clicked to tell internal from external applications.
+
+    pipeline: inline mode only. Load the next page in a second tab while applying on the current one, and switch to it when done instead of clicking next & waiting.
+
+    log_json_path: if given, every log record is also written there as one JSON object per line.
     """
 
     # Ensure state has all the keys in DEFAULT_STATE
     for k, v in DEFAULT_STATE.items():
         if k not in state:
             state[k] = v
+    assert state['window_size'] or not state['prune_dom'], '🔄 prune_dom needs a window_size'
+    state['mode'] = mode
 
     # Load environment variables
     if email is None or password is None:
@@ -294,82 +697,124 @@ def main(state=DEFAULT_STATE, driver=None, email=None, password=None, debug_leve
         chrome_options = Options()
         # Uncomment the line below if you want to run in headless mode
         # chrome_options.add_argument('--headless')
+        enable_network_log(chrome_options) # lets us confirm submissions from the network response
         # Initialize Chrome driver with automatic ChromeDriver management
         driver = webdriver.Chrome(
             service=Service(ChromeDriverManager().install()),
             options=chrome_options
         )
 
-    # Configure logging
-    logging.basicConfig(
-        level=debug_level,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        datefmt='%H:%M'
-    )
+    # Configure logging: formatting & writing happen on a background thread, so slow terminals/files don't stall the browser loop
+    configure_logging(debug_level, json_path=log_json_path)
     logging.getLogger("selenium").setLevel(logging.WARNING)
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("webdriver_manager").setLevel(logging.WARNING)
-    
-    # Create a colored formatter and apply it to the root logger
-    colored_formatter = ColoredFormatter(
-        fmt='%(asctime)s - %(levelname)s - %(message)s',
-        datefmt='%H:%M'
-    )
-    root_logger = logging.getLogger()
-    for handler in root_logger.handlers:
-        handler.setFormatter(colored_formatter)
 
     # Get helper functions
     helper_logger = logging.getLogger('selenium_helper')
     helper_logger.setLevel(logging.CRITICAL)
-    s = Helper(driver, helper_logger)
-
-    # Construct full URL with params
-    url = "https://jhu.joinhandshake.com/stu/postings"
-    params = {
-        "query": query_search,
-        "page": "1",
-        "per_page": state['jobs_per_page'],
-        "employmentTypes": "1", # Full-time
-        "employmentTypes": "2", # Part-time
-        "jobType": "3", # Internship
-        "jobType": "6", # On Campus Student Employment
-        "jobType": "7", # Fellowship
-        "pay%5BsalaryType%5D": "1", # Paid
-    }
-    full_url = f"{url}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
-    full_url = "https://jhu.joinhandshake.com/job-search/9566411?jobType=3&jobType=6&jobType=7&pay%5BsalaryType%5D=1&query=software+engineer&per_page=25&page=1"
+    s = Helper(driver, helper_logger, selectors=SelectorRegistry(driver, SELECTOR_CANDIDATES))
+
+    # Inline mode works through the first search only, scan & dry run modes fan out over all of them
+    searches = build_searches()
+    full_url = build_search_url(searches[0]['query'], searches[0]['filters'], page=1, per_page=state['jobs_per_page'])
     
     open_and_login(full_url, driver, s, email, password)
-    time.sleep(int(params['per_page']) / 100) # 10 seconds per 1000 jobs
+    time.sleep(int(state['jobs_per_page']) / 100) # 10 seconds per 1000 jobs
 
     # Apply to jobs and then click next
     state['session_start_time'] = datetime.now()
+    queue = JobQueue(queue_path) if mode in ('scan', 'apply', 'schedule') else None
+    index = PostingIndex(use_location=DEDUPE_BY_LOCATION) # jobs applied to or queued, across sessions
+    rejected = PostingIndex(path=None, use_location=DEDUPE_BY_LOCATION) # jobs filtered out or external, this run only
+    prefetcher = PagePrefetcher(driver) if pipeline and mode == 'inline' else None
     try:
+        if mode == 'apply':
+            apply_to_queued_jobs(state, s, queue)
+            return state, driver
+        if mode == 'dry_run':
+            state['did_log_submissions'] = True # dry runs don't count as sessions in job_tracking.json
+            dry_run_searches(state, s, index, searches, check_external=check_external)
+            return state, driver
+        if mode in ('scan', 'schedule') and rescan:
+            queue.reset_progress()
+        if mode == 'scan':
+            scan_searches(state, s, queue, index, rejected, searches)
+            return state, driver
+        if mode == 'schedule':
+            schedule_jobs(state, s, queue, index, rejected, searches, lookahead_pages)
+            return state, driver
+        # In pipeline mode, the next page loads in a second tab while we apply on this one
+        prefetch_next_page = lambda: prefetcher.prefetch(
+            build_search_url(searches[0]['query'], searches[0]['filters'], page=state['tab_count'] + 1, per_page=state['jobs_per_page'])
+        )
         while True:
-            apply_to_jobs_in_left_panel(state, s)
-            s.click_with_wait(SELECTORS['pagination_next_btn'])
+            if prefetcher:
+                apply_to_jobs_in_left_panel(state, s, index, rejected, on_page_start=prefetch_next_page)
+            else:
+                apply_to_jobs_in_left_panel(state, s, index, rejected)
+            # Fall back to clicking next if the next page couldn't be prefetched
+            handed_over = prefetcher.handover() if prefetcher else False
+            if not handed_over:
+                click_next_page(s)
             state['tab_count'] += 1
             logging.info(f'⏭️ Going to next page: {state["tab_count"]}')
             logging.debug(f'state at this point: {state}')
-            time.sleep(int(params['per_page']) / 100)
+            if not handed_over:
+                time.sleep(int(state['jobs_per_page']) / 100)
     except Exception as e:
         logging.critical(f"Error occurred in main(): {str(e)}")
         logging.critical(traceback.format_exc())
     finally:
         update_job_tracking(state)
+        if queue:
+            queue.close()
+        if prefetcher:
+            prefetcher.discard()
+        s.selectors.save()
     
     return state, driver
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Apply to Handshake jobs')
+    parser.add_argument('--mode', choices=['inline', 'scan', 'apply', 'schedule'], default='inline', help='inline: scan & apply in one loop; scan: only queue candidates; apply: only apply to queued jobs; schedule: scan ahead and apply best jobs first')
+    parser.add_argument('--queue', default="utils/job_queue.db", help='Path to the SQLite job queue shared by scan and apply workers')
+    parser.add_argument('--rescan', action='store_true', help='scan/schedule mode: start every search from page 1 again instead of resuming')
+    parser.add_argument('--lookahead-pages', type=int, default=5, help='schedule mode: pages to scan ahead before applying to the best jobs found')
+    parser.add_argument('--log-json', help='Also write logs to this file as JSON lines')
+    parser.add_argument('--pipeline', action='store_true', help='inline mode: load the next page in a second tab while applying on the current one')
+    parser.add_argument('--dry-run', action='store_true', help='Classify every job on every page of every search and write utils/dry_run_report.json, without applying')
+    parser.add_argument('--no-external-check', action='store_true', help='dry run: don\'t click cards to check for external applications (faster, but external jobs show up as candidates)')
+    parser.add_argument('--per-page', type=int, default=DEFAULT_STATE['jobs_per_page'], help='Jobs per results page')
+    parser.add_argument('--window-size', type=int, default=0, help='inline mode: handle job cards in windows of this many, only holding handles for the current window')
+    parser.add_argument('--prune-dom', action='store_true', help='inline mode, with --window-size: hide finished cards on the page')
+    args = parser.parse_args()
+    if args.prune_dom and not args.window_size:
+        parser.error('--prune-dom needs --window-size')
+
+    state = dict(DEFAULT_STATE, jobs_per_page=args.per_page, window_size=args.window_size, prune_dom=args.prune_dom)
+    mode = 'dry_run' if args.dry_run else args.mode
     try:
-        state, driver = main()
-        logging.critical('🪦 Program died: outside main function')
-        time.sleep(3600)
+        state, driver = main(
+            state=state,
+            mode=mode,
+            queue_path=args.queue,
+            rescan=args.rescan,
+            log_json_path=args.log_json,
+            check_external=not args.no_external_check,
+            lookahead_pages=args.lookahead_pages,
+            pipeline=args.pipeline,
+        )
+        # Inline mode only returns if something went wrong, so keep the browser open to look at it. The other modes return when they're done
+        if mode == 'inline':
+            logging.critical('🪦 Program died: outside main function')
+            time.sleep(3600)
     except Exception as e:
         logging.critical('🪦 Error occurred in main:')
         logging.critical(traceback.format_exc())
-        time.sleep(3600)
+        if mode == 'inline':
+            time.sleep(3600)
     finally:
         update_job_tracking(state)
         driver.quit()
+        stop_logging()
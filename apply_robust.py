@@ -8,6 +8,7 @@ import json
 import time
 from apply import update_job_tracking
 from apply import DEFAULT_STATE
+from utils.submission_watcher import enable_network_log
 
 def get_last_applied_job_idx():
     try:
@@ -40,6 +41,7 @@ while True:
         # Set up driver
         chrome_options = Options()
         # chrome_options.add_argument('--headless') # Headless mode :o
+        enable_network_log(chrome_options)
         driver = webdriver.Chrome(
             service=Service(ChromeDriverManager().install()),
             options=chrome_options
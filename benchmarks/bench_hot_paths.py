@@ -0,0 +1,238 @@
+"""
+Microbenchmarks for the pure-Python hot paths of the bot. Runs offline, no browser or Handshake account needed.
+
+Usage (from the repo root):
+    python benchmarks/bench_hot_paths.py                  # run and compare against saved baselines
+    python benchmarks/bench_hot_paths.py --save-baseline  # run and store results as the new baselines
+    python benchmarks/bench_hot_paths.py --threshold 10   # flag anything more than 10% slower than its baseline
+
+Exits with status 1 if any benchmark regressed past the threshold, so it can gate a commit or CI step.
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timedelta
+
+# Import modules from the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.job_filter import passes_keyword_filters
+from utils.job_tracking import update_job_tracking
+from utils.clean_json import clean_sessions
+from utils.timer import format_duration
+from utils.logging_formatter import ColoredFormatter
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+HISTORY_SIZE = 5000 # sessions in the fake job_tracking.json
+
+SAMPLE_TITLES = [
+    "Software Engineer Intern - Summer 2025",
+    "Machine Learning Research Intern",
+    "Mechanical Engineering Co-op",
+    "Frontend Developer (React) Internship",
+    "Math Teacher Assistant",
+    "Unpaid Marketing Intern",
+    "DevOps / Site Reliability Engineer Intern",
+    "Barista",
+]
+
+def fake_tracking_data(n_sessions):
+    start = datetime(2025, 1, 1)
+    sessions = []
+    for i in range(n_sessions):
+        submissions = random.randint(0, 40)
+        failures = random.randint(0, 10)
+        sessions.append({
+            "date": (start + timedelta(hours=i)).strftime("%m/%d/%y %I:%M%p").lower(),
+            "session_submissions": submissions,
+            "job_list_len": 25,
+            "visited_indices": [i * 25, i * 25 + random.randint(0, 200)],
+            "last_applied_job_idx": i * 25,
+            "duplicates_skipped": random.randint(0, 10),
+            "candidates_count": submissions + failures,
+            "failures_count": failures,
+            "session_duration_minutes": round(random.uniform(1, 90), 2),
+        })
+    return {"total_submissions": sum(s["session_submissions"] for s in sessions), "last_applied_job_idx": 0, "sessions": sessions}
+
+def fake_state():
+    return {
+        'submissions_count': 12,
+        'job_list_len': 25,
+        'tab_count': 3,
+        'visited_indices': [0, 75],
+        'last_applied_job_idx': 70,
+        'did_log_submissions': False,
+        'session_start_time': datetime.now() - timedelta(minutes=30),
+        'num_jobs_to_skip_initially': 0,
+        'jobs_per_page': 25,
+        'duplicates_skipped': 4,
+        'candidates_count': 15,
+        'failures_count': 3,
+        'network_confirmed_count': 10,
+        'mode': 'inline',
+    }
+
+class FakeElement:
+    """
+    Just enough of a WebElement for Helper.stringify_elements.
+    """
+    def __init__(self, tag_name, attrs, text):
+        self.tag_name = tag_name
+        self.attrs = attrs
+        self.text = text
+
+class FakeDriver:
+    """
+    Answers execute_script the way Chrome would for Helper.SERIALIZE_ELEMENTS_SCRIPT.
+    """
+    def execute_script(self, script, elements, max_text_length):
+        return [
+            {
+                'tag': element.tag_name,
+                'attrs': dict(element.attrs),
+                'text': element.text[:max_text_length],
+                'value': element.attrs.get('value', '') if element.tag_name == 'input' else None,
+            }
+            for element in elements
+        ]
+
+def fake_elements(n):
+    elements = []
+    for i in range(n):
+        if i % 3 == 0:
+            elements.append(FakeElement("input", {"type": "text", "name": f"field-{i}", "aria-haspopup": "listbox"}, ""))
+        else:
+            elements.append(FakeElement("div", {"data-hook": "job-result-card", "id": f"job-{i}", "class": "card"}, f"Software Engineer Intern {i}\nAcme"))
+    return elements
+
+def bench_keyword_filter():
+    titles = SAMPLE_TITLES * 125
+    def run():
+        for title in titles:
+            passes_keyword_filters(title)
+    return run
+
+def bench_update_job_tracking(tmp_dir):
+    path = os.path.join(tmp_dir, "update_tracking.json")
+    payload = json.dumps(fake_tracking_data(HISTORY_SIZE))
+    def run():
+        # Reset the history so it stays the same size between runs
+        with open(path, 'w') as f:
+            f.write(payload)
+        update_job_tracking(fake_state(), tracking_file=path)
+    return run
+
+def bench_clean_sessions(tmp_dir):
+    path = os.path.join(tmp_dir, "clean_tracking.json")
+    payload = json.dumps(fake_tracking_data(HISTORY_SIZE))
+    def run():
+        with open(path, 'w') as f:
+            f.write(payload)
+        with contextlib.redirect_stdout(io.StringIO()):
+            clean_sessions(3, tracking_file=path)
+    return run
+
+def bench_format_duration():
+    durations = [0.5, 59.99, 61, 3599.5, 3600, 7322.25] * 200
+    def run():
+        for duration in durations:
+            format_duration(duration)
+    return run
+
+def bench_colored_formatter():
+    formatter = ColoredFormatter(fmt='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M')
+    levels = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR]
+    def run():
+        for i in range(1000):
+            record = logging.LogRecord('bench', levels[i % 4], __file__, 0, '📝 Trying to apply to job w/ title: %s', ('Software Engineer Intern',), None)
+            formatter.format(record)
+    return run
+
+def bench_stringify_elements():
+    from utils.selenium_helper import Helper
+    helper = Helper(FakeDriver(), logging.getLogger('bench'))
+    elements = fake_elements(200)
+    def run():
+        helper.stringify_elements(elements)
+    return run
+
+def collect_benchmarks(tmp_dir):
+    """
+    Returns {name: zero-arg callable}. Benchmarks whose optional dependencies (selenium) aren't installed are left out.
+    """
+    benchmarks = {
+        'keyword_filter': bench_keyword_filter(),
+        'update_job_tracking': bench_update_job_tracking(tmp_dir),
+        'clean_sessions': bench_clean_sessions(tmp_dir),
+        'format_duration': bench_format_duration(),
+        'colored_formatter': bench_colored_formatter(),
+    }
+    try:
+        benchmarks['stringify_elements'] = bench_stringify_elements()
+    except ImportError as e:
+        print(f"⚠️ Skipping stringify_elements: {e}")
+    return benchmarks
+
+def time_benchmark(func, repeat):
+    """
+    Best-of-`repeat` seconds per call. Calls are batched so each measurement takes at least 0.2s.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def load_baselines(path=BASELINE_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the bot\'s pure-Python hot paths')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run\'s results as the new baselines')
+    parser.add_argument('--threshold', type=float, default=20, help='percent slower than baseline that counts as a regression')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements per benchmark (the best one is kept)')
+    parser.add_argument('--baseline-file', default=BASELINE_FILE)
+    parser.add_argument('only', nargs='*', help='only run these benchmarks')
+    args = parser.parse_args()
+
+    random.seed(0)
+    baselines = load_baselines(args.baseline_file)
+    results, regressions = {}, []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, func in collect_benchmarks(tmp_dir).items():
+            if args.only and name not in args.only:
+                continue
+            seconds = time_benchmark(func, args.repeat)
+            results[name] = seconds
+
+            line = f"{name:<22} {seconds * 1000:10.3f} ms"
+            if name in baselines:
+                change = (seconds - baselines[name]) / baselines[name] * 100
+                line += f"   {change:+7.1f}% vs baseline"
+                if change > args.threshold:
+                    regressions.append(name)
+                    line += "   ❌ REGRESSION"
+            print(line)
+
+    if args.save_baseline:
+        baselines.update(results)
+        with open(args.baseline_file, 'w') as f:
+            json.dump(baselines, f, indent=4)
+        print(f"✅ Saved baselines to {args.baseline_file}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) more than {args.threshold}% slower than baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Behavior tests for the SQLite job queue, against an in-memory database.
+
+Run from the repo root: python -m pytest -q
+"""
+import os
+import sys
+import time
+
+import pytest
+
+# Import modules from the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.job_queue import JobQueue
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(':memory:', max_attempts=2, stale_after=600)
+    yield queue
+    queue.close()
+
+def push(queue, job_id, priority=0, source=None):
+    return queue.push(job_id, f'https://example.com/jobs/{job_id}', f'Intern {job_id}', 'Acme', source=source, priority=priority)
+
+def status(queue, job_id):
+    return queue.conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()['status']
+
+def test_push_is_idempotent_and_records_sources(queue):
+    assert push(queue, '1', source='a')
+    assert not push(queue, '1', source='b')
+    assert queue.contains('1')
+    assert not queue.contains('2')
+    assert queue.sources('1') == ['a', 'b']
+    assert queue.depth() == {'pending': 1}
+
+def test_claim_returns_highest_priority_then_oldest(queue):
+    push(queue, 'low', priority=1)
+    push(queue, 'high-old', priority=5)
+    push(queue, 'high-new', priority=5)
+
+    claimed = [queue.claim()['job_id'] for _ in range(3)]
+    assert claimed == ['high-old', 'high-new', 'low']
+    assert queue.claim() is None
+
+def test_claim_marks_job_in_progress(queue):
+    push(queue, '1')
+    job = queue.claim()
+    assert job['status'] == 'in_progress'
+    assert job['attempts'] == 1
+    assert job['claimed_at'] is not None
+    assert status(queue, '1') == 'in_progress'
+    assert queue.depth() == {'in_progress': 1}
+
+def test_ack_finishes_job(queue):
+    push(queue, '1')
+    push(queue, '2')
+    queue.ack(queue.claim()['job_id'])
+    queue.ack(queue.claim()['job_id'], status='skipped')
+    assert queue.depth() == {'done': 1, 'skipped': 1}
+    assert queue.claim() is None
+
+def test_nack_requeues_until_out_of_attempts(queue):
+    push(queue, '1')
+
+    queue.nack(queue.claim()['job_id'], 'modal did not open')
+    assert status(queue, '1') == 'pending'
+
+    job = queue.claim()
+    assert job['attempts'] == 2
+    queue.nack(job['job_id'], 'modal did not open again')
+    assert status(queue, '1') == 'failed'
+    assert queue.conn.execute("SELECT last_error FROM jobs WHERE job_id = '1'").fetchone()['last_error'] == 'modal did not open again'
+    assert queue.claim() is None
+
+def test_requeue_stale_only_touches_old_claims(queue):
+    push(queue, 'stale')
+    push(queue, 'fresh')
+    queue.claim()
+    queue.claim()
+    queue.conn.execute("UPDATE jobs SET claimed_at = ? WHERE job_id = 'stale'", (time.time() - 601,))
+
+    queue.requeue_stale()
+    assert status(queue, 'stale') == 'pending'
+    assert status(queue, 'fresh') == 'in_progress'
+
+    # claim() requeues stale jobs itself, so a dead worker's job gets picked up again
+    job = queue.claim()
+    assert job['job_id'] == 'stale'
+    assert job['attempts'] == 2
+
+def test_trim_evicts_lowest_priority_pending(queue):
+    for i in range(5):
+        push(queue, str(i), priority=i)
+    push(queue, 'claimed', priority=-1)
+    queue.conn.execute("UPDATE jobs SET status = 'in_progress' WHERE job_id = 'claimed'")
+
+    assert queue.trim(3) == 2
+    assert queue.depth() == {'pending': 3, 'evicted': 2, 'in_progress': 1}
+    assert status(queue, '0') == 'evicted'
+    assert status(queue, '1') == 'evicted'
+    assert queue.trim(3) == 0
+
+def test_progress(queue):
+    assert queue.get_progress('a') == (0, False)
+    queue.set_progress('a', 3)
+    queue.set_progress('b', 7, exhausted=True)
+    assert queue.get_progress('a') == (3, False)
+    assert queue.get_progress('b') == (7, True)
+    queue.reset_progress()
+    assert queue.get_progress('b') == (0, False)
+
+def test_evicted_job_can_be_pushed_again(queue):
+    push(queue, 'low', priority=1)
+    push(queue, 'high', priority=5)
+    queue.trim(1)
+    assert status(queue, 'low') == 'evicted'
+    assert not queue.contains('low')
+    assert queue.status('low') == 'evicted'
+
+    # Pushed again with a better score, it competes for a place again
+    assert push(queue, 'low', priority=9)
+    assert status(queue, 'low') == 'pending'
+    assert queue.claim()['job_id'] == 'low'
+    assert not push(queue, 'low', priority=9)
+
+def test_release_gives_claim_back_without_using_an_attempt(queue):
+    push(queue, '1')
+    queue.claim()
+    queue.release('1')
+    assert status(queue, '1') == 'pending'
+    job = queue.claim()
+    assert job['attempts'] == 1
+
+    # Only claimed postings can be released
+    queue.ack('1')
+    queue.release('1')
+    assert status(queue, '1') == 'done'
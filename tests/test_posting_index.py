@@ -0,0 +1,69 @@
+"""
+Tests for the posting fingerprint index and the file it persists to.
+
+Run from the repo root: python -m pytest -q
+"""
+import os
+import sys
+
+# Import modules from the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.posting_index import PostingIndex, fingerprint, normalise
+
+def test_normalise_ignores_case_punctuation_and_spacing():
+    assert normalise('Software Engineer Intern - Summer') == 'software engineer intern summer'
+    assert normalise('  software engineer   intern (summer)') == 'software engineer intern summer'
+    assert normalise('C++ / C# Developer') == 'c++ c# developer'
+    assert normalise(None) == ''
+
+def test_fingerprint():
+    assert fingerprint('Software Engineer Intern - Summer', 'Acme, Inc.') == fingerprint('software engineer intern (summer)', 'ACME Inc')
+    assert fingerprint('Software Engineer Intern', 'Acme') != fingerprint('Software Engineer Intern', 'Globex')
+    assert fingerprint('Intern', 'Acme', 'Baltimore, MD') != fingerprint('Intern', 'Acme', 'Remote')
+    assert 0 <= fingerprint('Intern', 'Acme') < 2 ** 64
+
+def test_add_and_contains_in_memory():
+    index = PostingIndex(path=None)
+    assert not index.contains('Intern', 'Acme')
+    assert index.add('Intern', 'Acme')
+    assert not index.add('intern', 'ACME')
+    assert index.contains('Intern', 'Acme')
+    assert len(index) == 1
+
+def test_location_only_counts_when_enabled():
+    index = PostingIndex(path=None)
+    index.add('Intern', 'Acme', 'Remote')
+    assert index.contains('Intern', 'Acme', 'Baltimore, MD')
+
+    index = PostingIndex(path=None, use_location=True)
+    index.add('Intern', 'Acme', 'Remote')
+    assert not index.contains('Intern', 'Acme', 'Baltimore, MD')
+
+def test_round_trips_through_file(tmp_path):
+    path = str(tmp_path / 'seen_postings.bin')
+    index = PostingIndex(path=path)
+    index.add('Intern', 'Acme')
+    index.add('Data Analyst', 'Globex')
+    index.add('Intern', 'Acme')
+    assert os.path.getsize(path) == 16
+
+    reloaded = PostingIndex(path=path)
+    assert len(reloaded) == 2
+    assert reloaded.contains('intern', 'acme')
+    assert reloaded.contains('Data Analyst', 'Globex')
+
+def test_torn_trailing_record_is_dropped(tmp_path):
+    path = str(tmp_path / 'seen_postings.bin')
+    PostingIndex(path=path).add('Intern', 'Acme')
+    with open(path, 'ab') as f:
+        f.write(b'\x01\x02\x03')
+
+    index = PostingIndex(path=path)
+    assert len(index) == 1
+    assert os.path.getsize(path) == 8
+
+    # New records line up again after the partial one is cut off
+    index.add('Data Analyst', 'Globex')
+    reloaded = PostingIndex(path=path)
+    assert reloaded.contains('Intern', 'Acme')
+    assert reloaded.contains('Data Analyst', 'Globex')
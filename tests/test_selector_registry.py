@@ -0,0 +1,113 @@
+"""
+Tests for the selector registry's ordering, miss accounting and fail-fast, against a fake driver.
+
+Run from the repo root: python -m pytest -q
+"""
+import os
+import sys
+import time
+
+import pytest
+
+pytest.importorskip('selenium')
+
+# Import modules from the repo root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.selector_registry import SelectorNotFound, SelectorRegistry
+
+class FakeElement:
+    def __init__(self, displayed=True):
+        self.displayed = displayed
+
+    def is_displayed(self):
+        return self.displayed
+
+    def is_enabled(self):
+        return True
+
+class FakeDriver:
+    """
+    find_elements answers with an element for every selector in `present`, and counts the lookups per selector.
+    """
+    def __init__(self, present=()):
+        self.present = set(present)
+        self.lookups = {}
+
+    def find_elements(self, by, selector):
+        self.lookups[selector] = self.lookups.get(selector, 0) + 1
+        return [FakeElement()] if selector in self.present else []
+
+def registry(driver, tmp_path, **kwargs):
+    candidates = {'submit_btn': ['#primary', '#fallback', '//button[@type="submit"]']}
+    return SelectorRegistry(driver, candidates, stats_path=str(tmp_path / 'selector_stats.json'), **kwargs)
+
+def test_declared_order_until_something_misses(tmp_path):
+    selectors = registry(FakeDriver({'#primary', '#fallback'}), tmp_path)
+    assert selectors.ordered('submit_btn') == ['#primary', '#fallback', '//button[@type="submit"]']
+    assert selectors.find('submit_btn', timeout=0)
+    assert selectors.best('submit_btn') == '#primary'
+
+def test_fallback_that_matches_gets_promoted(tmp_path):
+    driver = FakeDriver({'#fallback'})
+    selectors = registry(driver, tmp_path)
+    assert selectors.find('submit_btn', timeout=0)
+    assert selectors.ordered('submit_btn')[0] == '#fallback'
+    assert selectors.stats['submit_btn']['#primary']['misses'] == 1
+    assert selectors.stats['submit_btn']['#fallback']['hits'] == 1
+
+    # Once promoted, the primary isn't even probed while the fallback keeps matching
+    driver.lookups.clear()
+    selectors.find('submit_btn', timeout=0)
+    assert driver.lookups == {'#fallback': 1}
+
+def test_lookup_that_matches_nothing_records_no_misses(tmp_path):
+    selectors = registry(FakeDriver(), tmp_path)
+    for _ in range(10):
+        assert selectors.find('submit_btn', timeout=0) is None
+    assert all(stats['misses'] == 0 for stats in selectors.stats['submit_btn'].values())
+    assert selectors.ordered('submit_btn') == ['#primary', '#fallback', '//button[@type="submit"]']
+
+def test_clickable_skips_hidden_elements(tmp_path):
+    driver = FakeDriver({'#primary'})
+    driver.find_elements = lambda by, selector: [FakeElement(displayed=False)]
+    selectors = registry(driver, tmp_path)
+    assert selectors.find('submit_btn', timeout=0, clickable=True) is None
+    assert selectors.find('submit_btn', timeout=0)
+
+def test_stats_persist(tmp_path):
+    selectors = registry(FakeDriver({'#fallback'}), tmp_path)
+    selectors.find('submit_btn', timeout=0)
+    selectors.save()
+    assert registry(FakeDriver(), tmp_path).best('submit_btn') == '#fallback'
+
+def test_required_lookup_raises_with_report(tmp_path):
+    selectors = registry(FakeDriver(), tmp_path)
+    with pytest.raises(SelectorNotFound) as error:
+        selectors.find('submit_btn', timeout=0, required=True)
+    assert "No selector matched for 'submit_btn'" in str(error.value)
+    assert '#fallback' in str(error.value)
+
+def test_required_lookups_fail_fast_after_missing_in_a_row(tmp_path):
+    driver = FakeDriver()
+    selectors = registry(driver, tmp_path, fail_fast_after=2)
+    for _ in range(2):
+        with pytest.raises(SelectorNotFound):
+            selectors.find('submit_btn', timeout=0.3, required=True)
+    assert selectors.is_failing('submit_btn')
+
+    start = time.perf_counter()
+    with pytest.raises(SelectorNotFound) as error:
+        selectors.find('submit_btn', timeout=5, required=True)
+    assert time.perf_counter() - start < 1
+    assert 'required lookups in a row' in str(error.value)
+
+    # A match ends the fail-fast
+    driver.present.add('#primary')
+    assert selectors.find('submit_btn', timeout=0, required=True)
+    assert not selectors.is_failing('submit_btn')
+
+def test_optional_lookups_never_fail_fast(tmp_path):
+    selectors = registry(FakeDriver(), tmp_path, fail_fast_after=1)
+    for _ in range(3):
+        assert selectors.find('submit_btn', timeout=0) is None
+    assert not selectors.is_failing('submit_btn')
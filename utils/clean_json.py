@@ -1,9 +1,9 @@
 import json
 from pprint import pprint
 
-def clean_sessions(min_submissions):
+def clean_sessions(min_submissions, tracking_file="utils/job_tracking.json"):
     # Load the JSON data from the file
-    with open('utils/job_tracking.json', 'r') as file:
+    with open(tracking_file, 'r') as file:
         data = json.load(file)
     
     # Filter sessions based on the minimum number of submissions
@@ -22,7 +22,7 @@ def clean_sessions(min_submissions):
     data['total_submissions'] = total_submissions
     
     # Write the updated data back to the JSON file
-    with open('utils/job_tracking.json', 'w') as file:
+    with open(tracking_file, 'w') as file:
         json.dump(data, file, indent=4)
     
     # Log success message and pprint the cleaned sessions
@@ -0,0 +1,68 @@
+import logging
+import re
+from utils.query_keywords import bad_keywords as default_bad_keywords, good_keywords as default_good_keywords, preferred_employers as default_preferred_employers
+
+# Weights for ranking candidates (see score_job)
+KEYWORD_MATCH_WEIGHT = 1.0 # per good keyword found in the title, across all levels
+RECENCY_WEIGHT = 3.0 # for a job posted just now, halving every RECENCY_HALF_LIFE_DAYS
+RECENCY_HALF_LIFE_DAYS = 7
+
+DAYS_PER_UNIT = {'minute': 1 / 1440, 'hour': 1 / 24, 'day': 1, 'week': 7, 'month': 30, 'year': 365}
+
+def keyword_filter_reason(title_text, good_keywords=default_good_keywords, bad_keywords=default_bad_keywords):
+    """
+    Why a job title fails our keyword filters, or None if it passes.
+
+    Returns ('level', level_name) if no keyword of some level of good_keywords is in the title, or ('bad_keyword', keyword) for the first bad keyword found.
+    """
+    title_lower = title_text.lower()
+
+    # Check that all levels of good_keywords are satisfied
+    for level_name, good_keyword_level in good_keywords.items():
+        if not any(keyword.lower() in title_lower for keyword in good_keyword_level):
+            return 'level', level_name
+
+    # Check that no bad keywords are in the title
+    for keyword in bad_keywords:
+        if keyword.lower() in title_lower:
+            return 'bad_keyword', keyword
+    return None
+
+def passes_keyword_filters(title_text, good_keywords=default_good_keywords, bad_keywords=default_bad_keywords):
+    """
+    Checks a job title against our keywords: at least one match in every level of good_keywords, and no bad keywords.
+    """
+    reason = keyword_filter_reason(title_text, good_keywords, bad_keywords)
+    if reason and reason[0] == 'level':
+        logging.info(f"✋ Skipping job with title: {title_text} - doesn't match requirement for {reason[1]}")
+    return reason is None
+
+def posted_days_ago(card_text):
+    """
+    How many days ago a job was posted, parsed from text like "Posted 3 days ago" anywhere in its card. None if the card doesn't say.
+    """
+    card_text = (card_text or '').lower()
+    if 'just now' in card_text or 'today' in card_text:
+        return 0
+    if 'yesterday' in card_text:
+        return 1
+    match = re.search(r'\b(\d+|an?|one) (minute|hour|day|week|month|year)s? ago', card_text)
+    if not match:
+        return None
+    amount = 1 if not match.group(1).isdigit() else int(match.group(1))
+    return amount * DAYS_PER_UNIT[match.group(2)]
+
+def score_job(title_text, company_name, card_text=None, good_keywords=default_good_keywords, preferred_employers=default_preferred_employers):
+    """
+    How much we want a job, to apply to the best ones first: more matched keywords, more recent postings and preferred employers score higher.
+    """
+    title_lower = title_text.lower()
+    score = KEYWORD_MATCH_WEIGHT * sum(keyword.lower() in title_lower for level in good_keywords.values() for keyword in set(level))
+
+    days_ago = posted_days_ago(card_text)
+    if days_ago is not None:
+        score += RECENCY_WEIGHT * 0.5 ** (days_ago / RECENCY_HALF_LIFE_DAYS)
+
+    company_lower = (company_name or '').lower()
+    score += sum(bonus for employer, bonus in preferred_employers.items() if employer in company_lower)
+    return round(score, 3)
@@ -0,0 +1,212 @@
+import sqlite3
+import time
+
+class JobQueue:
+    """
+    Durable queue of job postings backed by SQLite, shared by the scanner (producer) and applier workers (consumers).
+
+    Postings move pending -> in_progress -> done | skipped | failed, and are claimed highest priority first.
+    With a capacity (see `trim`), the lowest-priority pending postings are evicted until they're pushed again. A posting that is claimed but never acked (e.g. the
+    worker's browser died) goes back to pending once it's been in progress for longer than `stale_after` seconds, so
+    queue depth and retry state survive restarts. Several processes can share the same file.
+    """
+
+    def __init__(self, path="utils/job_queue.db", max_attempts=3, stale_after=600):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.stale_after = stale_after
+
+        # Autocommit mode, we open transactions ourselves where a claim has to be atomic
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                title TEXT,
+                company TEXT,
+                priority REAL NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                enqueued_at REAL NOT NULL,
+                claimed_at REAL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # Queues created before jobs had a priority
+        columns = [row['name'] for row in self.conn.execute("PRAGMA table_info(jobs)")]
+        if 'priority' not in columns:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, priority)")
+
+        # Which searches each posting showed up in
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_sources (
+                job_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                PRIMARY KEY (job_id, source)
+            )
+        """)
+
+        # How far the scanner got in each search, so a restarted scan picks up where it left off
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_progress (
+                source TEXT PRIMARY KEY,
+                last_page INTEGER NOT NULL DEFAULT 0,
+                exhausted INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def push(self, job_id, url, title=None, company=None, source=None, priority=0):
+        """
+        Adds a posting to the queue, found by search `source`. Returns False if it was already queued (in any status but 'evicted').
+        An evicted posting goes back to pending with its new priority, so it competes for a place in the queue again.
+        """
+        now = time.time()
+        cursor = self.conn.execute(
+            """
+            INSERT INTO jobs (job_id, url, title, company, priority, enqueued_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (job_id) DO UPDATE SET
+                status = 'pending', url = excluded.url, title = excluded.title, company = excluded.company,
+                priority = excluded.priority, updated_at = excluded.updated_at
+            WHERE status = 'evicted'
+            """,
+            (job_id, url, title, company, priority, now, now),
+        )
+        if source is not None:
+            self.add_source(job_id, source)
+        return cursor.rowcount == 1
+
+    def contains(self, job_id):
+        """
+        Whether a posting is queued, in any status but 'evicted' (evicted postings can be pushed again).
+        """
+        return self.status(job_id) not in (None, 'evicted')
+
+    def status(self, job_id):
+        """
+        Status of a posting, or None if it was never queued.
+        """
+        row = self.conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row['status'] if row else None
+
+    def add_source(self, job_id, source):
+        """
+        Records that a posting also showed up in search `source`.
+        """
+        self.conn.execute("INSERT OR IGNORE INTO job_sources (job_id, source) VALUES (?, ?)", (job_id, source))
+
+    def sources(self, job_id):
+        rows = self.conn.execute("SELECT source FROM job_sources WHERE job_id = ? ORDER BY source", (job_id,)).fetchall()
+        return [row['source'] for row in rows]
+
+    def claim(self):
+        """
+        Claims the highest-priority pending posting (oldest first on ties) for this worker and returns it as a dict, or None if nothing is pending.
+        """
+        self.requeue_stale()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' ORDER BY priority DESC, enqueued_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            now = time.time()
+            self.conn.execute(
+                "UPDATE jobs SET status = 'in_progress', attempts = attempts + 1, claimed_at = ?, updated_at = ? WHERE job_id = ?",
+                (now, now, row['job_id']),
+            )
+            self.conn.execute("COMMIT")
+        except:
+            self.conn.execute("ROLLBACK")
+            raise
+        job = dict(row)
+        job.update(status='in_progress', attempts=job['attempts'] + 1, claimed_at=now, updated_at=now)
+        return job
+
+    def ack(self, job_id, status='done'):
+        """
+        Marks a claimed posting as finished. Use status='skipped' for postings we decided not to apply to.
+        """
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, last_error = NULL, updated_at = ? WHERE job_id = ?",
+            (status, time.time(), job_id),
+        )
+
+    def nack(self, job_id, error=None):
+        """
+        Releases a claimed posting after a failed attempt. It goes back to pending unless it's out of attempts.
+        """
+        self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, last_error = ?, updated_at = ? WHERE job_id = ?",
+            (self.max_attempts, error, time.time(), job_id),
+        )
+
+    def release(self, job_id):
+        """
+        Gives a claimed posting back without counting the attempt, for when the worker failed rather than the posting (e.g. its browser died).
+        """
+        self.conn.execute(
+            "UPDATE jobs SET status = 'pending', attempts = MAX(attempts - 1, 0), claimed_at = NULL, updated_at = ? WHERE job_id = ? AND status = 'in_progress'",
+            (time.time(), job_id),
+        )
+
+    def requeue_stale(self):
+        """
+        Puts postings that have been in progress for too long (their worker probably died) back in pending.
+        """
+        self.conn.execute(
+            "UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'in_progress' AND claimed_at < ?",
+            (time.time(), time.time() - self.stale_after),
+        )
+
+    def trim(self, capacity):
+        """
+        Bounds the number of pending postings to `capacity` by evicting the lowest-priority ones (status 'evicted', until
+        they're pushed again). Returns how many were evicted.
+        """
+        cursor = self.conn.execute(
+            """
+            UPDATE jobs SET status = 'evicted', updated_at = ? WHERE job_id IN (
+                SELECT job_id FROM jobs WHERE status = 'pending' ORDER BY priority DESC, enqueued_at LIMIT -1 OFFSET ?
+            )
+            """,
+            (time.time(), capacity),
+        )
+        return cursor.rowcount
+
+    def get_progress(self, source):
+        """
+        Returns (last_page, exhausted) for search `source`: the last results page scanned, and whether we ran out of pages.
+        """
+        row = self.conn.execute("SELECT last_page, exhausted FROM search_progress WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return 0, False
+        return row['last_page'], bool(row['exhausted'])
+
+    def set_progress(self, source, last_page, exhausted=False):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO search_progress (source, last_page, exhausted, updated_at) VALUES (?, ?, ?, ?)",
+            (source, last_page, int(exhausted), time.time()),
+        )
+
+    def reset_progress(self):
+        """
+        Forgets how far every search got, so the next scan starts all of them from page 1 (postings already queued stay queued).
+        """
+        self.conn.execute("DELETE FROM search_progress")
+
+    def depth(self):
+        """
+        Returns the number of postings in each status, e.g. {'pending': 12, 'done': 40}.
+        """
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,53 @@
+import json
+import logging
+from datetime import datetime
+from utils.timer import timer
+
+@timer
+def update_job_tracking(state, tracking_file="utils/job_tracking.json"):
+    """
+    Updates job tracking file with current state.
+    """
+    if state['did_log_submissions']:
+        return
+    
+    # Calculate session duration in minutes
+    session_duration = round((datetime.now() - state['session_start_time']).total_seconds() / 60, 2)
+    
+    # Initialize empty data file if it doesn't exist, and initialize `data` either way
+    try:
+        # Read existing data
+        with open(tracking_file, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        # Initialize if file doesn't exist or is invalid
+        data = {"total_submissions": 0, "last_applied_job_idx": 0, "sessions": []}
+    
+    # Update cumulative stats
+    data["total_submissions"] += state['submissions_count']
+    data["last_applied_job_idx"] = max(data["last_applied_job_idx"], state['last_applied_job_idx'])
+    
+    # Add new session to `data.sessions`
+    current_time = datetime.now().strftime("%m/%d/%y %I:%M%p").lower()
+    logging.debug(f'Logging job list len: {state["job_list_len"]}, tab count: {state["tab_count"]}, visited range: {state["visited_indices"]}')
+    new_session = {
+        "date": current_time,
+        "mode": state['mode'],
+        "session_submissions": state['submissions_count'],
+        "job_list_len": state['job_list_len'],
+        "visited_indices": state['visited_indices'],
+        "last_applied_job_idx": state['last_applied_job_idx'],
+        "duplicates_skipped": state['duplicates_skipped'],
+        "candidates_count": state['candidates_count'],
+        "failures_count": state['failures_count'],
+        "network_confirmed_count": state['network_confirmed_count'],
+        "session_duration_minutes": session_duration
+    }
+    data["sessions"].append(new_session)
+        
+    # Write updated data to data file
+    with open(tracking_file, 'w') as f:
+        json.dump(data, f, indent=4)
+
+    # Mark that we've logged submissions
+    state['did_log_submissions'] = True
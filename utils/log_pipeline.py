@@ -0,0 +1,58 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from utils.logging_formatter import ColoredFormatter, JsonLinesFormatter
+
+_listener = None
+
+class PassThroughQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records as they are. The stock prepare() formats the record on the calling thread (and drops
+    exc_info), which is the work we want off the browser loop. Within one process nothing needs pickling, so we can skip it.
+    """
+
+    def prepare(self, record):
+        return record
+
+def configure_logging(level=logging.INFO, json_path=None, fmt='%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M'):
+    """
+    Routes every log record through a queue: the calling thread (i.e. the browser loop) only enqueues the record, and a
+    background thread does the formatting & writing to the console (colored) and, if `json_path` is given, to a JSON-lines file.
+
+    Safe to call again (e.g. once per retry in apply_robust.py): the previous pipeline is flushed and replaced.
+    """
+    stop_logging()
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(ColoredFormatter(fmt=fmt, datefmt=datefmt))
+    handlers = [console_handler]
+    if json_path:
+        json_handler = logging.FileHandler(json_path, encoding='utf-8')
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(PassThroughQueueHandler(log_queue))
+    root_logger.setLevel(level)
+
+    global _listener
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+def stop_logging():
+    """
+    Flushes everything still in the queue and stops the background thread. Called automatically at exit.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+atexit.register(stop_logging)
@@ -1,3 +1,4 @@
+import json
 import logging
 
 class ColoredFormatter(logging.Formatter):
@@ -13,8 +14,26 @@ class ColoredFormatter(logging.Formatter):
     }
 
     def format(self, record):
-        # Add color to the levelname
+        # Add color to the levelname, and put it back afterwards so other handlers get the plain levelname
         levelname = record.levelname
-        if levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
-        return super().format(record)
\ No newline at end of file
+        if levelname not in self.COLORS:
+            return super().format(record)
+        record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line, for analysing runs after the fact"""
+
+    def format(self, record):
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
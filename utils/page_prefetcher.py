@@ -0,0 +1,63 @@
+import logging
+
+class PagePrefetcher:
+    """
+    Loads the next results page in a second tab of the same browser session while the main tab is busy applying,
+    then swaps it in as the main tab once the current page is done, so page loads stay off the critical path.
+
+    The page is opened with window.open from the main tab, which returns right away (unlike driver.get, which blocks
+    until the page has loaded), and the driver is kept pointed at the main tab until the handover.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.prefetched_handle = None
+        self.prefetched_url = None
+
+    def prefetch(self, url):
+        """
+        Starts loading `url` in a background tab. Replaces any page prefetched earlier that wasn't handed over.
+        """
+        self.discard()
+        main_handle = self.driver.current_window_handle
+        handles_before = set(self.driver.window_handles)
+        self.driver.execute_script("window.open(arguments[0], '_blank');", url)
+        new_handles = set(self.driver.window_handles) - handles_before
+        if not new_handles:
+            logging.error(f'🔄 Failed to open a tab to prefetch {url}')
+            return
+        self.prefetched_handle = new_handles.pop()
+        self.prefetched_url = url
+
+        # Bring the main tab back to the front, Chrome may have focused the new one
+        self.driver.switch_to.window(main_handle)
+        logging.debug(f'Prefetching next page in background tab: {url}')
+
+    def handover(self):
+        """
+        Closes the main tab and makes the prefetched tab the new main tab. Returns False if nothing was prefetched.
+        """
+        if self.prefetched_handle is None:
+            return False
+        self.driver.close()
+        self.driver.switch_to.window(self.prefetched_handle)
+        logging.debug(f'Switched to prefetched page: {self.prefetched_url}')
+        self.prefetched_handle = None
+        self.prefetched_url = None
+        return True
+
+    def discard(self):
+        """
+        Closes the prefetched tab without using it (e.g. when shutting down).
+        """
+        if self.prefetched_handle is None:
+            return
+        main_handle = self.driver.current_window_handle
+        try:
+            self.driver.switch_to.window(self.prefetched_handle)
+            self.driver.close()
+        except Exception as e:
+            logging.debug(f'Prefetched tab was already gone: {str(e)}')
+        self.driver.switch_to.window(main_handle)
+        self.prefetched_handle = None
+        self.prefetched_url = None
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import re
+from array import array
+
+def normalise(text):
+    """
+    Lowercases text and collapses punctuation/whitespace, so "Software Engineer Intern - Summer" and
+    "software engineer intern (summer)" end up the same.
+    """
+    return ' '.join(re.sub(r'[^a-z0-9+#]+', ' ', (text or '').lower()).split())
+
+def fingerprint(title, company, location=None):
+    """
+    64-bit fingerprint of a posting from its normalised title and employer (and location, if given).
+    """
+    key = f'{normalise(title)}|{normalise(company)}'
+    if location is not None:
+        key += f'|{normalise(location)}'
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+class PostingIndex:
+    """
+    Set of fingerprints of postings we've already dealt with, so copies of the same role (reposts, or the same job
+    showing up on another page or another query) can be skipped with a hash lookup instead of a click.
+
+    Fingerprints are kept in memory as a set of ints and persisted as an append-only file of 8-byte integers
+    (pass path=None for an index that only lives in memory).
+    """
+
+    def __init__(self, path="utils/seen_postings.bin", use_location=False):
+        self.path = path
+        self.use_location = use_location
+        self.fingerprints = set()
+        if path and os.path.exists(path):
+            data = array('Q')
+            with open(path, 'rb') as f:
+                raw = f.read()
+            # A crash mid-append can leave a partial record at the end: drop it, and cut it off the file so new records line up again
+            torn = len(raw) % data.itemsize
+            if torn:
+                raw = raw[:-torn]
+                with open(path, 'r+b') as f:
+                    f.truncate(len(raw))
+            data.frombytes(raw)
+            self.fingerprints.update(data)
+
+    def _fingerprint(self, title, company, location=None):
+        return fingerprint(title, company, location if self.use_location else None)
+
+    def contains(self, title, company, location=None):
+        return self._fingerprint(title, company, location) in self.fingerprints
+
+    def add(self, title, company, location=None):
+        """
+        Records a posting. Returns False if it was already in the index.
+        """
+        fp = self._fingerprint(title, company, location)
+        if fp in self.fingerprints:
+            return False
+        self.fingerprints.add(fp)
+        if self.path:
+            with open(self.path, 'ab') as f:
+                f.write(array('Q', [fp]).tobytes())
+        return True
+
+    def __len__(self):
+        return len(self.fingerprints)
@@ -9,6 +9,24 @@ Note: Jobs will be applied to that have at least 1 match in all levels of good_k
 # What will be typed in Handshake's search bar to find jobs
 query_search = "software engineer internship"
 
+# Every search the scanner fans out over (see `python apply.py --mode scan`). Each query is run once per filter set
+# in `search_filters`, and all of them feed one de-duplicated queue.
+query_searches = [
+    query_search,
+    "ml intern",
+    "devops",
+]
+
+# Handshake search filters, as (param, value) pairs since params like jobType repeat
+search_filters = {
+    'paid internships': [
+        ("jobType", "3"), # Internship
+        ("jobType", "6"), # On Campus Student Employment
+        ("jobType", "7"), # Fellowship
+        ("pay[salaryType]", "1"), # Paid
+    ],
+}
+
 # Keywords to search for in job titles
 good_keywords = {
     # Require 'intern' or 'internship'
@@ -88,3 +106,10 @@ bad_keywords = [
     'teacher',
     'teaching',
 ]
+
+# Employers to apply to first in schedule mode, as {lowercase substring of the company name: priority bonus}.
+# A keyword match is worth 1 and a job posted today about 3, so a bonus of 5 puts an employer near the front of the queue.
+preferred_employers = {
+    # 'google': 5,
+    # 'johns hopkins': 2,
+}
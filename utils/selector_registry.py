@@ -0,0 +1,137 @@
+import json
+import logging
+import time
+from selenium.webdriver.common.by import By
+
+class SelectorNotFound(Exception):
+    pass
+
+class SelectorRegistry:
+    """
+    Keeps an ordered list of candidate selectors for each logical target (e.g. 'submit_btn'), so a Handshake markup change
+    only breaks the bot if every candidate for a target breaks.
+
+    Every lookup records which candidate matched and how long it took. Candidates are tried by hit rate, then average latency,
+    so the fastest working one gets promoted to the front; the stats (and so the learned ordering) persist in `stats_path`.
+    A lookup polls all candidates at once, so a miss costs one timeout rather than one per candidate.
+
+    A candidate only gets a miss when another candidate matched in its place. A lookup where nothing matched says nothing about
+    the selectors (the modal didn't open, we're on the last page, the toast hasn't rendered yet), so it isn't recorded.
+    Lookups that are `required` are different, the element has to be there: once a target's required lookups have come up empty
+    `fail_fast_after` times in a row, its required lookups take one look without waiting and raise right away, until one matches again.
+    """
+
+    def __init__(self, driver, candidates, stats_path="utils/selector_stats.json", fail_fast_after=3):
+        self.driver = driver
+        self.candidates = candidates
+        self.stats_path = stats_path
+        self.fail_fast_after = fail_fast_after
+        self.required_misses = {} # target -> required lookups in a row that matched nothing
+        try:
+            with open(stats_path, 'r') as f:
+                self.stats = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.stats = {}
+
+    def _stats(self, name, selector):
+        return self.stats.setdefault(name, {}).setdefault(selector, {'hits': 0, 'misses': 0, 'total_latency': 0.0})
+
+    @staticmethod
+    def _by(selector):
+        return By.XPATH if selector.startswith(('/', '(')) else By.CSS_SELECTOR
+
+    def ordered(self, name):
+        """
+        Candidates for `name`, best first: highest hit rate, then lowest average latency, then the order they were declared in.
+        Untried candidates count as always hitting but slow, so they get tried before candidates that have been missed in favour of another.
+        """
+        def key(indexed):
+            idx, selector = indexed
+            stats = self._stats(name, selector)
+            lookups = stats['hits'] + stats['misses']
+            hit_rate = stats['hits'] / lookups if lookups else 1.0
+            avg_latency = stats['total_latency'] / stats['hits'] if stats['hits'] else float('inf')
+            return -hit_rate, avg_latency, idx
+        return [selector for _, selector in sorted(enumerate(self.candidates[name]), key=key)]
+
+    def best(self, name):
+        """
+        The candidate currently in front for `name`, e.g. to use in a script.
+        """
+        return self.ordered(name)[0]
+
+    def _probe(self, name, parent, clickable):
+        """
+        One pass over the candidates, best first. Returns (matching selector, its elements, candidates tried before it that didn't match).
+        """
+        missed = []
+        for selector in self.ordered(name):
+            try:
+                elements = parent.find_elements(self._by(selector), selector)
+                if clickable:
+                    elements = [el for el in elements if el.is_displayed() and el.is_enabled()]
+            except Exception: # invalid selector for this page, or elements went stale mid-check
+                elements = []
+            if elements:
+                return selector, elements, missed
+            missed.append(selector)
+        return None, [], missed
+
+    def find_all(self, name, parent=None, timeout=3, clickable=False, required=False):
+        """
+        Waits up to `timeout` seconds for any candidate of `name` to match, and returns the elements of the best candidate that matched.
+        Returns [] if none matched, or raises SelectorNotFound with a report of every candidate if `required`.
+        """
+        if parent is None:
+            parent = self.driver
+        start = time.perf_counter()
+
+        # Required target that keeps missing: one quick look, no waiting
+        if required and self.is_failing(name):
+            timeout = 0
+
+        while True:
+            selector, elements, missed = self._probe(name, parent, clickable)
+            if elements:
+                stats = self._stats(name, selector)
+                stats['hits'] += 1
+                stats['total_latency'] += time.perf_counter() - start
+                # Candidates ahead of the one that matched cost us a lookup for nothing, so they move back
+                for missed_selector in missed:
+                    self._stats(name, missed_selector)['misses'] += 1
+                self.required_misses[name] = 0
+                return elements
+            if time.perf_counter() - start >= timeout:
+                break
+            time.sleep(0.1)
+
+        if required:
+            self.required_misses[name] = self.required_misses.get(name, 0) + 1
+            raise SelectorNotFound(self.report(name))
+        logging.debug(f'No selector matched for {name} in {timeout}s')
+        return []
+
+    def is_failing(self, name):
+        """
+        Whether `name`'s required lookups have matched nothing `fail_fast_after` times in a row.
+        """
+        return self.required_misses.get(name, 0) >= self.fail_fast_after
+
+    def find(self, name, parent=None, timeout=3, clickable=False, required=False):
+        """
+        Like find_all, but returns the first matching element (or None).
+        """
+        elements = self.find_all(name, parent, timeout, clickable, required)
+        return elements[0] if elements else None
+
+    def report(self, name):
+        lines = [f"No selector matched for '{name}'" + (f" ({self.required_misses[name]} required lookups in a row, check the page markup)" if self.is_failing(name) else "") + ":"]
+        for selector in self.ordered(name):
+            stats = self._stats(name, selector)
+            avg_latency = f"{stats['total_latency'] / stats['hits'] * 1000:.0f}ms" if stats['hits'] else '-'
+            lines.append(f"  {selector}  hits: {stats['hits']}, misses: {stats['misses']}, avg latency: {avg_latency}")
+        return '\n'.join(lines)
+
+    def save(self):
+        with open(self.stats_path, 'w') as f:
+            json.dump(self.stats, f, indent=4)
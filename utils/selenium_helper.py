@@ -4,6 +4,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from typing import List
 import time
+import logging
 from functools import wraps
 from selenium.webdriver.common.action_chains import ActionChains
 
@@ -14,71 +15,113 @@ def log_execution_time(func):
         result = func(self, *args, **kwargs)
         end_time = time.time()
         execution_time = end_time - start_time
-        self.logging.debug(f'{func.__name__}{args} {kwargs} took {execution_time:.2f}s')
+        self.logging.debug('%s%s %s took %.2fs', func.__name__, args, kwargs, execution_time)
         return result
     return wrapper
 
 class Helper:
-  def __init__(self, driver, logging):
+  def __init__(self, driver, logging, selectors=None):
     self.driver = driver
     self.logging = logging
     self.actions = ActionChains(driver)
+    self.selectors = selectors # optional SelectorRegistry for lookups by logical target name
+
+  def is_enabled_for(self, level) -> bool:
+    """
+    Whether a message at `level` would be logged. Check this before building expensive messages (e.g. ones that stringify elements, which costs a browser round trip).
+    """
+    if hasattr(self.logging, 'isEnabledFor'):
+      return self.logging.isEnabledFor(level)
+    return logging.getLogger().isEnabledFor(level) # self.logging is the logging module itself
   
-  def stringify_elements(self, el_list: List[WebElement | None] | WebElement | None, relevant_attributes=[]) -> List[str]:
+  # Serializes a whole list of elements in one round trip to the browser. Text is capped at arguments[1] characters per element.
+  SERIALIZE_ELEMENTS_SCRIPT = """
+    const [elements, maxTextLength] = arguments;
+    return elements.map(element => {
+      if (!element) return null;
+      let attrs = {};
+      for (let i = 0; i < element.attributes.length; i++) {
+        attrs[element.attributes[i].name] = element.attributes[i].value;
+      }
+      let text = element.innerText || "";
+      if (text.length > maxTextLength) text = text.slice(0, maxTextLength) + "…";
+      return {
+        tag: element.tagName.toLowerCase(),
+        attrs: attrs,
+        text: text,
+        value: element.tagName === "INPUT" ? (element.value || "") : null,
+      };
+    });
+  """
+
+  def serialize_elements(self, el_list: List[WebElement | None], max_text_length=200) -> List[dict | None]:
+    """
+    Reads tag, attributes, visible text and (for inputs) the value property of every element in a single execute_script call.
+    Returns one dict per element ({'tag', 'attrs', 'text', 'value'}), or None where the element was None.
+    """
+    if not el_list:
+      return []
+    return self.driver.execute_script(self.SERIALIZE_ELEMENTS_SCRIPT, list(el_list), max_text_length)
+
+  def stringify_elements(self, el_list: List[WebElement | None] | WebElement | None, relevant_attributes=[], max_text_length=200, max_chars=5000) -> List[str]:
     """
     Stringifies a list of WebElements.
     If relevant_attributes is empty, all attributes will be included in the string.
     If relevant_attributes is provided, only the attributes in the list will be included in the string.
     Acts robustly in the case that some of the relevant_attributes are not present in the given element.
-    Includes the visible text content between the tags.
+    Includes the visible text content between the tags (cut at max_text_length characters per element).
     Ex. <input value="test">test</input>
+
+    All elements are read in one browser round trip (see serialize_elements), and output stops once it passes max_chars in total.
+    Never raises, since it's mostly called on error paths.
     """
     if not el_list:
       return "None"
     
-    element_strings = []
     if isinstance(el_list, WebElement):
       el_list = [el_list]
-    for element in el_list:
+    try:
+      serialized = self.serialize_elements(el_list, max_text_length)
+    except Exception as e:
+      return [f'<unreadable elements: {type(e).__name__}>']
+
+    element_strings = []
+    total_chars = 0
+    for i, element in enumerate(serialized):
+      if total_chars > max_chars:
+        element_strings.append(f'... ({len(serialized) - i} more)')
+        break
       if element is None:
         element_strings.append("None")
         continue
-      tag_name = element.tag_name
-      
-      # Get all attributes as a dictionary
-      attrs = self.driver.execute_script("""
-        let attrs = {};
-        let element = arguments[0];
-        for (let i = 0; i < element.attributes.length; i++) {
-          attrs[element.attributes[i].name] = element.attributes[i].value;
-        }
-        return attrs;
-      """, element)
+      tag_name = element['tag']
+      attrs = element['attrs']
 
-      # For input elements, also get the 'value' property (not always in attributes)
-      if tag_name.lower() == "input" and ("value" not in attrs or (relevant_attributes and "value" in relevant_attributes)):
-        attrs["value"] = element.get_attribute("value") or ""
+      # For input elements, also use the 'value' property (not always in attributes)
+      if element['value'] is not None and ("value" not in attrs or (relevant_attributes and "value" in relevant_attributes)):
+        attrs["value"] = element['value']
 
-      # Get the visible text content
-      text_content = element.text or ""
-      
       # Filter attributes if relevant_attributes is provided
       if relevant_attributes:
-        filtered_attrs = {}
-        for k in relevant_attributes:
-          if k in attrs:
-            filtered_attrs[k] = attrs[k]
-        attrs = filtered_attrs
+        attrs = {k: attrs[k] for k in relevant_attributes if k in attrs}
       
       # Format attributes as k='v'
       attr_str = ' '.join([f"{k}='{v}'" for k, v in attrs.items()])
       attr_str = f" {attr_str}" if attr_str else ""
       
       # Compose the HTML string
-      html_str = f"<{tag_name}{attr_str}>{text_content}</{tag_name}>"
+      html_str = f"<{tag_name}{attr_str}>{element['text']}</{tag_name}>"
       element_strings.append(html_str)
+      total_chars += len(html_str)
     return element_strings
 
+  def snapshot_dom(self, selector: str = "body *", limit=50, **kwargs) -> List[str]:
+    """
+    Cheap DOM snapshot for diagnosing failures: stringifies up to `limit` elements matching selector in two browser round trips.
+    Extra kwargs go to stringify_elements.
+    """
+    return self.stringify_elements(self.find_all_elements(selector)[:limit], **kwargs)
+
   def web_element_exists(self, element: WebElement) -> bool:
     try:
       element.is_displayed()
@@ -105,10 +148,10 @@ class Helper:
       res = WebDriverWait(parent, timeout).until(
         EC.element_to_be_clickable((by, selector))
       )
-      self.logging.debug(f'Searching for: {selector}; Found')
+      self.logging.debug('Searching for: %s; Found', selector)
       return res
     except:
-      self.logging.debug(f'Searching for: {selector}; Not found')
+      self.logging.debug('Searching for: %s; Not found', selector)
 
   def find_all_elements(self, selector: str, parent=None) -> List[WebElement]:
     try:
@@ -116,7 +159,7 @@ class Helper:
         parent = self.driver
       return parent.find_elements(By.CSS_SELECTOR, selector)
     except:
-      self.logging.debug(f'Searching for: {selector}; Not found')
+      self.logging.debug('Searching for: %s; Not found', selector)
       return []
 
   @log_execution_time
@@ -127,10 +170,10 @@ class Helper:
       res = WebDriverWait(parent, timeout).until(
           EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector))
       )
-      self.logging.debug(f'Searching for: {selector}; Found')
+      self.logging.debug('Searching for: %s; Found', selector)
       return res
     except:
-      self.logging.debug(f'Searching for: {selector}; Not found')
+      self.logging.debug('Searching for: %s; Not found', selector)
 
   @log_execution_time
   def find_any_element_with_wait(self, *selectors: str, parent=None) -> tuple[WebElement, int]:
@@ -151,7 +194,7 @@ class Helper:
       for idx, selector in enumerate(selectors):
         try:
           element = parent.find_element(By.CSS_SELECTOR, selector)
-          self.logging.debug(f'Found {selector} from list of args')
+          self.logging.debug('Found %s from list of args', selector)
           return element, idx
         except:
           pass
@@ -164,14 +207,14 @@ class Helper:
       if parent is None:
         parent = self.driver
       res = parent.find_element(by, selector)
-      self.logging.debug(f'Quick searching for: {selector}; Found')
+      self.logging.debug('Quick searching for: %s; Found', selector)
       return res
     except:
-      self.logging.debug(f'Quick searching for: {selector}; Not found')
+      self.logging.debug('Quick searching for: %s; Not found', selector)
 
   def click_web_element(self, element) -> None:
     try:
-      self.logging.debug(f'Clicking: {element}')
+      self.logging.debug('Clicking: %s', element)
       element.click()
       # self.driver.execute_script("""
       #   arguments[0].scrollIntoView(); 
@@ -179,9 +222,10 @@ class Helper:
       #   arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
       #   arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
       # """, element)
-      self.logging.debug(f'Clicked')
+      self.logging.debug('Clicked')
     except:
-      self.logging.error(f'Failed to click: {self.stringify_elements(element)}')
+      if self.is_enabled_for(logging.ERROR):
+        self.logging.error('Failed to click: %s', self.stringify_elements(element))
 
   def click_with_mouse(self, selector: str, parent=None) -> None:
     try:
@@ -190,20 +234,21 @@ class Helper:
       element = self.find_element(selector, parent)
       if not element: raise Exception(f'Element not found, so can\'t click: {selector}')
       self.click_web_element_with_mouse(element)
-      self.logging.debug(f'Clicked with mouse: {selector}')
+      self.logging.debug('Clicked with mouse: %s', selector)
     except:
-      self.logging.debug(f'Failed to click with mouse: {selector}')
+      self.logging.debug('Failed to click with mouse: %s', selector)
 
   def click_web_element_with_mouse(self, element) -> None:
     try:
       self.actions.move_to_element(element).click().perform()
-      self.logging.debug(f'Clicked with mouse: {self.stringify_elements(element)}')
+      if self.is_enabled_for(logging.DEBUG):
+        self.logging.debug('Clicked with mouse: %s', self.stringify_elements(element))
     except:
-      self.logging.debug(f'Failed to click web element')
+      self.logging.debug('Failed to click web element')
 
   @log_execution_time
   def click_with_wait(self, selector: str, by=By.CSS_SELECTOR, parent=None, timeout=3) -> None:
-    self.logging.debug(f'Clicking: {selector}')
+    self.logging.debug('Clicking: %s', selector)
     if parent is None:
       parent = self.driver
     element = self.find_element_with_wait(selector, by, parent)
@@ -212,35 +257,35 @@ class Helper:
       self.click_web_element(element, self.driver)
     else:
       self.driver.execute_script("arguments[0].click();", element)
-    self.logging.debug(f'Clicked: {selector}')
+    self.logging.debug('Clicked: %s', selector)
 
   @log_execution_time
   def click_with_wait_without_error(self, selector: str, parent=None, timeout=3) -> None:
     try:
       self.click_with_wait(selector, parent, timeout)
     except:
-      self.logging.debug(f'Couldn\'t click but didn\'t sweat: {selector}')
+      self.logging.debug('Couldn\'t click but didn\'t sweat: %s', selector)
 
   @log_execution_time
   def click_without_error(self, selector: str, parent=None) -> None:
     try:
       self.click(selector, parent)
     except:
-      self.logging.debug(f'Couldn\'t click but didn\'t sweat: {selector}')
+      self.logging.debug('Couldn\'t click but didn\'t sweat: %s', selector)
 
   @log_execution_time
   def click(self, selector: str, parent=None) -> None:
-    self.logging.debug(f'Quick clicking: {selector}')
+    self.logging.debug('Quick clicking: %s', selector)
     if parent is None:
       parent = self.driver
     element = self.find_element(selector, parent)
     if not element: raise Exception(f'Element not found, so can\'t click: {selector}')
     self.click_web_element(element)
-    self.logging.debug(f'Clicked')
+    self.logging.debug('Clicked')
 
   @log_execution_time
   def type_into_element_with_wait(self, selector: str, text, by=By.CSS_SELECTOR, parent=None, timeout=None) -> None:
-    self.logging.debug(f'Typing: {text} into: {selector}')
+    self.logging.debug('Typing: %s into: %s', text, selector)
     if parent is None:
         parent = self.driver
     
@@ -252,5 +297,5 @@ class Helper:
 
     if not element: raise Exception(f'Element not found, so can\'t type: {selector}')
     element.send_keys(text)
-    self.logging.debug(f'Typed')
+    self.logging.debug('Typed')
 
@@ -0,0 +1,157 @@
+import argparse
+import json
+import math
+import statistics
+from array import array
+from datetime import datetime
+
+NAN = float('nan')
+
+def load_columns(tracking_file="utils/job_tracking.json", skip_modes=('scan',)):
+    """
+    Reads the sessions in the tracking file into columns (one array per field), so the stats below are single passes over flat arrays
+    instead of lookups in thousands of dicts. Fields that older sessions didn't record yet are NaN, and sessions without a mode ran inline.
+
+    Sessions of `skip_modes` are left out: scan sessions never apply, so they'd only show up as 0 apps/min.
+    Visited jobs (and so candidates/visited) only count for inline sessions, the only ones that walk result pages card by card
+    (an apply worker only visits jobs that are already candidates).
+    """
+    with open(tracking_file, 'r') as f:
+        sessions = json.load(f)['sessions']
+
+    columns = {
+        'date': [],
+        'mode': [],
+        'submissions': array('d'),
+        'minutes': array('d'),
+        'visited': array('d'),
+        'candidates': array('d'),
+        'page_candidates': array('d'), # candidates of the sessions whose visited jobs count
+        'failures': array('d'),
+        'duplicates': array('d'),
+    }
+    for session in sessions:
+        mode = session.get('mode', 'inline')
+        if mode in skip_modes:
+            continue
+        start_idx, current_idx = session.get('visited_indices', [0, 0])
+        candidates = session.get('candidates_count', NAN)
+        columns['date'].append(datetime.strptime(session['date'], "%m/%d/%y %I:%M%p"))
+        columns['mode'].append(mode)
+        columns['submissions'].append(session['session_submissions'])
+        columns['minutes'].append(session.get('session_duration_minutes', NAN))
+        columns['visited'].append(current_idx - start_idx if mode == 'inline' else NAN)
+        columns['candidates'].append(candidates)
+        columns['page_candidates'].append(candidates if mode == 'inline' else NAN)
+        columns['failures'].append(session.get('failures_count', NAN))
+        columns['duplicates'].append(session.get('duplicates_skipped', NAN))
+    return columns
+
+def ratio(numerators, denominators):
+    """
+    Element-wise numerators / denominators, NaN where the denominator is 0 or missing.
+    """
+    return array('d', (n / d if d else NAN for n, d in zip(numerators, denominators)))
+
+def session_metrics(columns):
+    """
+    Per-session applications/minute, candidates/visited ratio and failure rate (failed attempts / candidates).
+    """
+    return {
+        'apps_per_minute': ratio(columns['submissions'], columns['minutes']),
+        'candidate_ratio': ratio(columns['page_candidates'], columns['visited']),
+        'failure_rate': ratio(columns['failures'], columns['candidates']),
+    }
+
+def daily_totals(columns):
+    """
+    Sums every column per calendar day, and recomputes the metrics from the sums (so long sessions weigh more than short ones).
+    """
+    days = {}
+    fields = [k for k in columns if k not in ('date', 'mode')]
+    for i, date in enumerate(columns['date']):
+        totals = days.setdefault(date.date(), dict.fromkeys(fields, 0.0))
+        for field in fields:
+            value = columns[field][i]
+            if not math.isnan(value):
+                totals[field] += value
+    for totals in days.values():
+        totals['apps_per_minute'] = totals['submissions'] / totals['minutes'] if totals['minutes'] else NAN
+        totals['candidate_ratio'] = totals['page_candidates'] / totals['visited'] if totals['visited'] else NAN
+        totals['failure_rate'] = totals['failures'] / totals['candidates'] if totals['candidates'] else NAN
+    return days
+
+def find_regressions(values, window=5, drop=0.3):
+    """
+    Indices of sessions whose value is more than `drop` (as a fraction) below the median of the `window` sessions before it.
+    Returns (index, median_before) pairs. NaNs are ignored.
+    """
+    regressions = []
+    recent = []
+    for i, value in enumerate(values):
+        if math.isnan(value):
+            continue
+        if len(recent) == window:
+            median_before = statistics.median(recent)
+            if median_before > 0 and value < (1 - drop) * median_before:
+                regressions.append((i, median_before))
+            recent.pop(0)
+        recent.append(value)
+    return regressions
+
+def find_regressions_by_mode(values, modes, window=5, drop=0.3):
+    """
+    find_regressions within each mode, so e.g. apply-worker sessions are only compared with other apply-worker sessions.
+    """
+    regressions = []
+    for mode in set(modes):
+        indices = [i for i, session_mode in enumerate(modes) if session_mode == mode]
+        mode_values = array('d', (values[i] for i in indices))
+        regressions += [(indices[j], median_before) for j, median_before in find_regressions(mode_values, window, drop)]
+    return sorted(regressions)
+
+def fmt(value, pct=False, integer=False):
+    if math.isnan(value):
+        return '-'
+    if integer:
+        return str(int(value))
+    return f'{value:.0%}' if pct else f'{value:.2f}'
+
+def print_report(columns, last=20, window=5, drop=0.3):
+    metrics = session_metrics(columns)
+    n = len(columns['date'])
+    print(f"📊 {n} sessions, {int(sum(columns['submissions']))} submissions in {sum(m for m in columns['minutes'] if not math.isnan(m)):.0f} minutes")
+
+    print(f"\nLast {min(last, n)} sessions:")
+    print(f"{'date':<17} {'mode':<8} {'apps':>5} {'mins':>7} {'apps/min':>9} {'cand/visited':>13} {'fail rate':>10} {'dupes':>6}")
+    for i in range(max(0, n - last), n):
+        print(
+            f"{columns['date'][i].strftime('%m/%d/%y %I:%M%p'):<17} {columns['mode'][i]:<8} {int(columns['submissions'][i]):>5} {fmt(columns['minutes'][i]):>7} "
+            f"{fmt(metrics['apps_per_minute'][i]):>9} {fmt(metrics['candidate_ratio'][i], pct=True):>13} "
+            f"{fmt(metrics['failure_rate'][i], pct=True):>10} {fmt(columns['duplicates'][i], integer=True):>6}"
+        )
+
+    print("\nPer day:")
+    print(f"{'day':<10} {'apps':>5} {'mins':>7} {'apps/min':>9} {'cand/visited':>13} {'fail rate':>10}")
+    for day, totals in sorted(daily_totals(columns).items()):
+        print(
+            f"{day.strftime('%m/%d/%y'):<10} {int(totals['submissions']):>5} {totals['minutes']:>7.1f} {fmt(totals['apps_per_minute']):>9} "
+            f"{fmt(totals['candidate_ratio'], pct=True):>13} {fmt(totals['failure_rate'], pct=True):>10}"
+        )
+
+    regressions = find_regressions_by_mode(metrics['apps_per_minute'], columns['mode'], window, drop)
+    if not regressions:
+        print(f"\n✅ No session was more than {drop:.0%} below the median apps/min of the {window} sessions of its mode before it")
+        return
+    print(f"\n⚠️ Throughput regressions (apps/min more than {drop:.0%} below the median of the previous {window} sessions of the same mode):")
+    for i, median_before in regressions:
+        print(f"  {columns['date'][i].strftime('%m/%d/%y %I:%M%p')} ({columns['mode'][i]}): {metrics['apps_per_minute'][i]:.2f} apps/min vs {median_before:.2f} before")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Throughput stats over the job tracking history')
+    parser.add_argument('--file', default="utils/job_tracking.json")
+    parser.add_argument('--last', type=int, default=20, help='number of most recent sessions to list')
+    parser.add_argument('--window', type=int, default=5, help='sessions in the rolling median that regressions are measured against')
+    parser.add_argument('--drop', type=float, default=0.3, help='fraction below the rolling median that counts as a regression')
+    args = parser.parse_args()
+    print_report(load_columns(args.file), args.last, args.window, args.drop)
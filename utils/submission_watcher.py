@@ -0,0 +1,64 @@
+import json
+import logging
+import re
+import time
+
+# Handshake-specific, like SELECTORS in apply.py: how to recognise the request that submits an application.
+# A POST matches if its URL matches SUBMIT_URL_PATTERN, or its body matches SUBMIT_BODY_PATTERN (for GraphQL mutations).
+# If confirmations stop showing up in the logs one day, it's likely here.
+SUBMIT_URL_PATTERN = re.compile(r'/applications?(/|\?|$)', re.IGNORECASE)
+SUBMIT_BODY_PATTERN = re.compile(r'(create|submit)\w*application', re.IGNORECASE)
+
+def enable_network_log(chrome_options):
+    """
+    Turns on Chrome's performance log with network events only, which SubmissionWatcher reads.
+    """
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+class SubmissionWatcher:
+    """
+    Confirms an application from the network response to its submit request (read from Chrome's performance log),
+    instead of waiting for the "Application submitted!" toast to render.
+
+    Create it right before clicking submit: creating it drains the log, so only requests sent after that are considered.
+    If the driver wasn't started with enable_network_log, `available` is False and wait_for_response always returns None.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.submit_request_ids = set()
+        try:
+            self.driver.get_log('performance')
+            self.available = True
+        except Exception:
+            self.available = False
+
+    def _is_submit_request(self, request):
+        if request.get('method') != 'POST':
+            return False
+        return bool(SUBMIT_URL_PATTERN.search(request.get('url', '')) or SUBMIT_BODY_PATTERN.search(request.get('postData', '')))
+
+    def wait_for_response(self, timeout=2, poll_interval=0.05):
+        """
+        Waits for the response to the submit request. Returns (succeeded, status_code) as soon as it arrives
+        (status_code is None if the request failed without a response), or None if no submit request was answered in `timeout` seconds.
+        """
+        if not self.available:
+            return None
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            for entry in self.driver.get_log('performance'):
+                message = json.loads(entry['message'])['message']
+                params = message.get('params', {})
+                request_id = params.get('requestId')
+                if message['method'] == 'Network.requestWillBeSent' and self._is_submit_request(params.get('request', {})):
+                    self.submit_request_ids.add(request_id)
+                    logging.debug(f"Submit request sent: {params['request']['url']}")
+                elif message['method'] == 'Network.responseReceived' and request_id in self.submit_request_ids:
+                    status = params['response']['status']
+                    return 200 <= status < 300, status
+                elif message['method'] == 'Network.loadingFailed' and request_id in self.submit_request_ids:
+                    return False, None
+            time.sleep(poll_interval)
+        return None